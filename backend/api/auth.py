@@ -3,22 +3,30 @@ Authentication API endpoints.
 Handles user registration, login, and OAuth2 email account linking.
 """
 from datetime import timedelta, datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, EmailStr, Field
+from functools import lru_cache
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from fastapi.security import OAuth2PasswordBearer
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, ValidationError
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session
 import uuid
 import logging
 
-from database import get_db
+from database import get_db, dialect_insert, SessionLocal
 from models import User, EmailAccount
 from security.encryption import (
     hash_password,
     verify_password,
     create_access_token,
-    verify_token,
     token_encryption,
 )
+from security.token_cache import get_token_payload
 from connectors.gmail import GmailConnector
+from googleapiclient.discovery import build
+from google.oauth2.credentials import Credentials as GoogleCredentials
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -26,6 +34,16 @@ logger = logging.getLogger(__name__)
 # Router for auth endpoints
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
+# Bearer token extraction; auto_error=False so we raise our own 401 below
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+# Access token lifetime
+ACCESS_TOKEN_TTL = timedelta(hours=24)
+ACCESS_TOKEN_TTL_SECONDS = int(ACCESS_TOKEN_TTL.total_seconds())
+
+# Verified against when the login email is unknown, so both paths cost one hash
+_DUMMY_HASH = hash_password("dummy-for-timing-equalization")
+
 
 # ============================================================================
 # Request/Response Models
@@ -80,6 +98,17 @@ class TokenResponse(BaseModel):
         }
 
 
+class TokenPayload(BaseModel):
+    """Claims carried by an access token."""
+    sub: str
+    email: EmailStr
+    exp: int
+
+
+# Built once at import so the pydantic-core validator is reused for every request
+_TOKEN_ADAPTER = TypeAdapter(TokenPayload)
+
+
 class UserResponse(BaseModel):
     """User response model."""
     id: str = Field(..., description="User ID")
@@ -123,37 +152,42 @@ async def register(
     
     Returns: New user object with authentication details
     """
-    # Check if email already exists
-    existing_user = db.query(User).filter(User.email == request.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Email address already registered",
-        )
-
-    # Check if username already exists
-    existing_username = db.query(User).filter(User.username == request.username).first()
-    if existing_username:
+    # Check email and username uniqueness in one round-trip
+    existing = db.query(User.email, User.username).filter(
+        or_(User.email == request.email, User.username == request.username)
+    ).first()
+    if existing:
+        if existing.email == request.email:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Email address already registered",
+            )
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="Username already taken",
         )
 
     # Create new user
-    hashed_password = hash_password(request.password)
-    new_user = User(
+    hashed_password = await run_in_threadpool(hash_password, request.password)
+    # RETURNING hands back the generated id/created_at without a follow-up SELECT
+    stmt = insert(User).values(
         email=request.email,
         username=request.username,
         hashed_password=hashed_password,
         full_name=request.full_name,
         is_active=True,
-    )
-
-    db.add(new_user)
+    ).returning(User.id, User.created_at)
+    row = db.execute(stmt).one()
     db.commit()
-    db.refresh(new_user)
 
-    return new_user
+    return UserResponse(
+        id=row.id,
+        email=request.email,
+        username=request.username,
+        full_name=request.full_name,
+        is_active=True,
+        created_at=row.created_at.isoformat(),
+    )
 
 
 # ============================================================================
@@ -179,6 +213,7 @@ async def login(
     # Find user by email
     user = db.query(User).filter(User.email == request.email).first()
     if not user:
+        await run_in_threadpool(verify_password, request.password, _DUMMY_HASH)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -186,7 +221,7 @@ async def login(
         )
 
     # Verify password
-    if not verify_password(request.password, user.hashed_password):
+    if not await run_in_threadpool(verify_password, request.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password",
@@ -201,16 +236,15 @@ async def login(
         )
 
     # Create access token
-    expires_delta = timedelta(hours=24)
     access_token = create_access_token(
         data={"sub": user.id, "email": user.email},
-        expires_delta=expires_delta,
+        expires_delta=ACCESS_TOKEN_TTL,
     )
 
     return TokenResponse(
         access_token=access_token,
         token_type="bearer",
-        expires_in=int(expires_delta.total_seconds()),
+        expires_in=ACCESS_TOKEN_TTL_SECONDS,
     )
 
 
@@ -219,47 +253,80 @@ async def login(
 # ============================================================================
 
 
-def get_current_user(
-    authorization: str = None,
+async def get_current_user(
+    request: Request,
+    token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
 ) -> User:
     """
     Dependency to get current authenticated user from JWT token.
     
     Accepts token in Authorization header: "Bearer <token>"
+    The resolved user is memoized on request.state for the rest of the request.
     """
+    cached_user = getattr(request.state, "user", None)
+    if cached_user is not None:
+        return cached_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    if not authorization:
+    if not token:
         raise credentials_exception
     
-    # Extract token from "Bearer <token>"
-    parts = authorization.split()
-    if len(parts) != 2 or parts[0].lower() != "bearer":
-        raise credentials_exception
-    
-    token = parts[1]
-    
-    payload = verify_token(token)
+    payload = get_token_payload(token)
     if payload is None:
         raise credentials_exception
 
-    user_id: str = payload.get("sub")
-    if user_id is None:
+    try:
+        claims = _TOKEN_ADAPTER.validate_python(payload)
+    except ValidationError:
         raise credentials_exception
+    user_id = claims.sub
 
-    user = db.query(User).filter(User.id == user_id).first()
+    # Only the DB lookup blocks; run it off the event loop.
+    # Session.get checks the identity map before issuing a SELECT.
+    user = await run_in_threadpool(db.get, User, user_id)
     if user is None:
         raise credentials_exception
 
+    request.state.user = user
     return user
 
 
-@router.get("/me", response_model=UserResponse)
+@lru_cache(maxsize=10_000)
+def _serialize_user(
+    user_id: str,
+    updated_at_iso: Optional[str],
+    email: str,
+    username: str,
+    full_name: Optional[str],
+    is_active: bool,
+    created_at_iso: Optional[str],
+) -> dict:
+    """
+    Build the /me payload once per user version.
+
+    updated_at is part of the key so any profile change produces a fresh entry.
+    """
+    return {
+        "id": user_id,
+        "email": email,
+        "username": username,
+        "full_name": full_name,
+        "is_active": is_active,
+        "created_at": created_at_iso,
+    }
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+@router.get("/me", response_model=None, responses={200: {"model": UserResponse}})
 async def get_me(
     current_user: User = Depends(get_current_user),
 ):
@@ -270,13 +337,46 @@ async def get_me(
     
     Returns: Current user object
     """
-    return current_user
+    # Bypass response_model validation on this hot path; the payload is cached
+    # per (user, updated_at) and matches UserResponse.
+    return ORJSONResponse(_serialize_user(
+        current_user.id,
+        _isoformat(current_user.updated_at),
+        current_user.email,
+        current_user.username,
+        current_user.full_name,
+        current_user.is_active,
+        _isoformat(current_user.created_at),
+    ))
 
 # ============================================================================
 # OAuth2 Email Accounts: Gmail
 # ============================================================================
 
 
+def create_gmail_connector() -> GmailConnector:
+    """Build a GmailConnector from application settings."""
+    return GmailConnector(
+        client_id=settings.gmail_client_id,
+        client_secret=settings.gmail_client_secret,
+        redirect_uri=settings.gmail_redirect_uri,
+    )
+
+
+async def get_gmail_connector(request: Request) -> GmailConnector:
+    """
+    Dependency returning the app-wide GmailConnector.
+
+    Built once in the app lifespan; created on first use if the lifespan
+    did not run (e.g. a TestClient used without a context manager).
+    """
+    connector = getattr(request.app.state, "gmail_connector", None)
+    if connector is None:
+        connector = create_gmail_connector()
+        request.app.state.gmail_connector = connector
+    return connector
+
+
 class GmailAuthStartRequest(BaseModel):
     """Request to start Gmail OAuth2 flow."""
     pass
@@ -291,6 +391,7 @@ class GmailAuthStartResponse(BaseModel):
 async def start_gmail_oauth(
     request: GmailAuthStartRequest,
     current_user: User = Depends(get_current_user),
+    gmail: GmailConnector = Depends(get_gmail_connector),
 ):
     """
     Start Gmail OAuth2 flow.
@@ -305,13 +406,6 @@ async def start_gmail_oauth(
     # Generate state parameter for CSRF protection
     state = str(uuid.uuid4())
     
-    # Create Gmail connector
-    gmail = GmailConnector(
-        client_id=settings.gmail_client_id,
-        client_secret=settings.gmail_client_secret,
-        redirect_uri=settings.gmail_redirect_uri,
-    )
-    
     # Get authorization URL
     auth_url = gmail.get_authorization_url(state=state)
     
@@ -324,7 +418,7 @@ async def start_gmail_oauth(
 async def gmail_oauth_callback(
     code: str,
     state: str,
-    db: Session = Depends(get_db),
+    gmail: GmailConnector = Depends(get_gmail_connector),
 ):
     """
     Handle Gmail OAuth2 callback.
@@ -346,25 +440,17 @@ async def gmail_oauth_callback(
                 detail="Missing authorization code",
             )
         
-        # Create Gmail connector
-        gmail = GmailConnector(
-            client_id=settings.gmail_client_id,
-            client_secret=settings.gmail_client_secret,
-            redirect_uri=settings.gmail_redirect_uri,
-        )
-        
         # Exchange code for tokens
         token_data = gmail.handle_oauth_callback(code=code, state=state)
         
         # Extract email from JWT token in authorization_code
         # For now, we'll fetch it from Gmail API using the access token
-        from googleapiclient.discovery import build
-        from google.oauth2.credentials import Credentials as GoogleCredentials
-        
         service = build(
             "gmail",
             "v1",
             credentials=GoogleCredentials(token=token_data["access_token"]),
+            cache_discovery=False,
+            static_discovery=True,  # bundled discovery doc, no HTTPS fetch
         )
         profile = service.users().getProfile(userId="me").execute()
         gmail_email = profile.get("emailAddress")
@@ -400,80 +486,95 @@ class GmailLinkRequest(BaseModel):
     access_token: str = Field(..., description="Gmail access token from OAuth callback")
     refresh_token: str = Field(..., description="Gmail refresh token from OAuth callback")
     gmail_email: str = Field(..., description="Gmail email address")
-    expires_at: str = Field(..., description="Token expiration timestamp")
+    expires_at: datetime = Field(..., description="Token expiration timestamp (ISO 8601)")
+
+
+def _do_link(
+    user_id: str,
+    gmail_email: str,
+    access_token: str,
+    refresh_token: Optional[str],
+    expires_at: datetime,
+) -> None:
+    """
+    Encrypt Gmail tokens and upsert the EmailAccount row.
+
+    Runs as a background task after the response is sent, so it opens its
+    own session rather than reusing the request's.
+    """
+    db = SessionLocal()
+    try:
+        # Encrypt tokens before storing
+        access_token_encrypted = token_encryption.encrypt(access_token)
+        refresh_token_encrypted = token_encryption.encrypt(refresh_token) if refresh_token else None
+        
+        # Create or update EmailAccount in one atomic upsert. The conflict
+        # update only applies to rows owned by the current user, so an
+        # account linked to someone else returns no row.
+        stmt = dialect_insert(db, EmailAccount).values(
+            user_id=user_id,
+            provider="gmail",
+            email=gmail_email,
+            access_token_encrypted=access_token_encrypted,
+            refresh_token_encrypted=refresh_token_encrypted,
+            token_expires_at=expires_at,
+            is_active=True,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["provider", "email"],
+            set_={
+                "access_token_encrypted": stmt.excluded.access_token_encrypted,
+                "refresh_token_encrypted": stmt.excluded.refresh_token_encrypted,
+                "token_expires_at": stmt.excluded.token_expires_at,
+                "is_active": True,
+                "updated_at": datetime.utcnow(),
+            },
+            where=EmailAccount.user_id == user_id,
+        ).returning(EmailAccount.id)
+        
+        email_account = db.execute(stmt).first()
+        if email_account is None:
+            db.rollback()
+            logger.warning(f"Gmail account {gmail_email} already linked to another user; not linking to {user_id}")
+            return
+        db.commit()
+        logger.info(f"Linked Gmail account {gmail_email} to user {user_id} ({email_account.id})")
+        
+    except Exception as e:
+        logger.error(f"Error linking Gmail account: {e}")
+        db.rollback()
+    finally:
+        db.close()
 
 
-@router.post("/gmail/link", response_model=dict)
+@router.post("/gmail/link", response_model=dict, status_code=status.HTTP_202_ACCEPTED)
 async def link_gmail_account(
     request: GmailLinkRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
 ):
     """
     Link Gmail account to current user.
     
-    Stores encrypted access/refresh tokens in EmailAccount table.
+    Stores encrypted access/refresh tokens in EmailAccount table. The
+    encryption and upsert run after the response is sent.
     
     Requires: Valid JWT token and Gmail OAuth tokens from callback
     
-    Returns: Email account details
+    Returns: Acceptance status for the link request
     """
-    try:
-        # Check if this Gmail account is already linked to another user
-        existing = db.query(EmailAccount).filter(
-            EmailAccount.provider == "gmail",
-            EmailAccount.email == request.gmail_email,
-        ).first()
-        
-        if existing and existing.user_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Gmail account already linked to another user",
-            )
-        
-        # Encrypt tokens before storing
-        access_token_encrypted = token_encryption.encrypt(request.access_token)
-        refresh_token_encrypted = token_encryption.encrypt(request.refresh_token) if request.refresh_token else None
-        
-        # Create or update EmailAccount
-        if existing:
-            existing.access_token_encrypted = access_token_encrypted
-            existing.refresh_token_encrypted = refresh_token_encrypted
-            existing.token_expires_at = datetime.fromisoformat(request.expires_at.replace('Z', '+00:00'))
-            existing.is_active = True
-            db.commit()
-            db.refresh(existing)
-            email_account = existing
-            logger.info(f"Updated Gmail account {request.gmail_email} for user {current_user.id}")
-        else:
-            email_account = EmailAccount(
-                user_id=current_user.id,
-                provider="gmail",
-                email=request.gmail_email,
-                access_token_encrypted=access_token_encrypted,
-                refresh_token_encrypted=refresh_token_encrypted,
-                token_expires_at=datetime.fromisoformat(request.expires_at.replace('Z', '+00:00')),
-                is_active=True,
-            )
-            db.add(email_account)
-            db.commit()
-            db.refresh(email_account)
-            logger.info(f"Linked Gmail account {request.gmail_email} to user {current_user.id}")
-        
-        return {
-            "status": "success",
-            "message": f"Gmail account {request.gmail_email} linked successfully",
-            "email_account_id": email_account.id,
-            "provider": email_account.provider,
-            "email": email_account.email,
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error linking Gmail account: {e}")
-        db.rollback()
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to link Gmail account: {str(e)}",
-        )
\ No newline at end of file
+    background_tasks.add_task(
+        _do_link,
+        current_user.id,
+        request.gmail_email,
+        request.access_token,
+        request.refresh_token,
+        request.expires_at,
+    )
+    
+    return {
+        "status": "accepted",
+        "message": f"Linking Gmail account {request.gmail_email}",
+        "provider": "gmail",
+        "email": request.gmail_email,
+    }
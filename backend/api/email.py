@@ -5,14 +5,25 @@ Provides endpoints for email operations (fetch, classify, etc).
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from celery.exceptions import TimeoutError as CeleryTimeoutError
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 from backend.dependencies import get_db, get_current_user
 from backend.models import User, EmailJob, EmailAccount
-from backend.worker.tasks.classifier import classify_email, classify_emails_batch
-from backend.llm.classifier import EmailClassifier
+from backend.api.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from backend.response_cache import response_cache_key, get_cached_response, cache_response
+from backend.worker.tasks.classifier import classify_email, classify_manual_batch
+from backend.worker.tasks.dispatch import dispatch_chunked
+
+# Upper bound on IDs per batch request, keeps broker fan-out bounded
+MAX_BATCH_SIZE = 500
+
+# Seconds classify-manual waits for its batched result
+MANUAL_CLASSIFY_TIMEOUT = 10
 
 router = APIRouter(prefix="/api/v1/email", tags=["email"])
 
@@ -29,8 +40,7 @@ class ClassificationResult(BaseModel):
     confidence: float
     explanation: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class EmailJobResponse(BaseModel):
@@ -46,8 +56,13 @@ class EmailJobResponse(BaseModel):
     created_at: datetime
     classified_at: Optional[datetime]
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Columns EmailJobResponse reads; selecting just these keeps body off the wire
+_EMAIL_JOB_RESPONSE_COLUMNS = tuple(
+    getattr(EmailJob, field) for field in EmailJobResponse.model_fields
+)
 
 
 class ClassifyEmailRequest(BaseModel):
@@ -59,7 +74,7 @@ class ClassifyEmailRequest(BaseModel):
 class ClassifyEmailsRequest(BaseModel):
     """Request to classify multiple emails."""
     
-    email_job_ids: list[str]
+    email_job_ids: list[str] = Field(..., max_length=MAX_BATCH_SIZE)
 
 
 class ManualClassificationRequest(BaseModel):
@@ -74,12 +89,17 @@ class ManualClassificationRequest(BaseModel):
 # Endpoints
 # ============================================================================
 
-@router.get("/jobs/{email_job_id}", response_model=EmailJobResponse)
-async def get_email_job(
+@router.get(
+    "/jobs/{email_job_id}",
+    response_model=None,
+    responses={200: {"model": EmailJobResponse}},
+)
+def get_email_job(
     email_job_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> EmailJobResponse:
+) -> ORJSONResponse:
     """
     Get email job details.
     
@@ -89,10 +109,17 @@ async def get_email_job(
     Returns:
         Email job with classification results (if available)
     """
-    email_job = db.query(EmailJob).filter(
-        EmailJob.id == email_job_id,
-        EmailJob.user_id == current_user.id,
-    ).first()
+    cache_key = response_cache_key(current_user.id, request)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+    
+    email_job = db.execute(
+        select(*_EMAIL_JOB_RESPONSE_COLUMNS).where(
+            EmailJob.id == email_job_id,
+            EmailJob.user_id == current_user.id,
+        )
+    ).mappings().first()
     
     if not email_job:
         raise HTTPException(
@@ -100,11 +127,13 @@ async def get_email_job(
             detail="Email job not found",
         )
     
-    return EmailJobResponse.from_orm(email_job)
+    response = ORJSONResponse(dict(email_job))
+    cache_response(cache_key, response)
+    return response
 
 
 @router.post("/classify", response_model=dict)
-async def classify_email_endpoint(
+def classify_email_endpoint(
     request: ClassifyEmailRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -121,13 +150,13 @@ async def classify_email_endpoint(
     Returns:
         Task ID for tracking classification status
     """
-    # Verify email exists and belongs to user
-    email_job = db.query(EmailJob).filter(
+    # Verify email exists and belongs to user; fetch only the id
+    email_job_exists = db.query(EmailJob.id).filter(
         EmailJob.id == request.email_job_id,
         EmailJob.user_id == current_user.id,
-    ).first()
+    ).scalar()
     
-    if not email_job:
+    if not email_job_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Email job not found",
@@ -147,9 +176,8 @@ async def classify_email_endpoint(
 
 
 @router.post("/classify-batch", response_model=dict)
-async def classify_emails_endpoint(
+def classify_emails_endpoint(
     request: ClassifyEmailsRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> dict:
     """
@@ -161,35 +189,26 @@ async def classify_emails_endpoint(
         request: List of email job IDs
         
     Returns:
-        Task ID for tracking batch status
+        Group ID for tracking batch status
     """
-    # Verify all emails exist and belong to user
-    email_count = db.query(EmailJob).filter(
-        EmailJob.id.in_(request.email_job_ids),
-        EmailJob.user_id == current_user.id,
-    ).count()
-    
-    if email_count != len(request.email_job_ids):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Some email jobs not found",
-        )
-    
-    # Submit batch classification task
-    task = classify_emails_batch.apply_async(
-        args=(request.email_job_ids,),
-        kwargs={"user_context": {"user_id": current_user.id}},
+    # No ownership query here: each task loads its email filtered by
+    # user_context, so IDs the user doesn't own come back as
+    # "EmailJob not found" in the group results
+    job = dispatch_chunked(
+        classify_email,
+        request.email_job_ids,
+        user_context={"user_id": current_user.id},
     )
     
     return {
-        "task_id": task.id,
+        "task_id": job.id,
         "email_count": len(request.email_job_ids),
         "status": "submitted",
     }
 
 
 @router.post("/classify-manual", response_model=ClassificationResult)
-async def classify_manual_endpoint(
+def classify_manual_endpoint(
     request: ManualClassificationRequest,
     current_user: User = Depends(get_current_user),
 ) -> dict:
@@ -205,16 +224,18 @@ async def classify_manual_endpoint(
         Classification result with category, confidence, explanation
         
     Raises:
-        HTTPException: If OpenAI API not configured
+        HTTPException: If OpenAI API not configured or the worker times out
     """
     try:
-        classifier = EmailClassifier()
-        result = classifier.classify(
+        # Requests are buffered by the worker and classified in batches,
+        # grouped by user_id
+        async_result = classify_manual_batch.delay(
+            user_id=current_user.id,
             sender=request.sender,
             subject=request.subject,
             body=request.body,
-            user_context={"user_id": current_user.id},
         )
+        result = async_result.get(timeout=MANUAL_CLASSIFY_TIMEOUT)
         
         return {
             "email_job_id": "manual",
@@ -223,6 +244,11 @@ async def classify_manual_endpoint(
             "explanation": result["explanation"],
         }
         
+    except CeleryTimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Classification timed out",
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -235,15 +261,20 @@ async def classify_manual_endpoint(
         )
 
 
-@router.get("/classified", response_model=list[EmailJobResponse])
-async def get_classified_emails(
+@router.get(
+    "/classified",
+    response_model=None,
+    responses={200: {"model": list[EmailJobResponse]}},
+)
+def get_classified_emails(
+    request: Request,
     category: Optional[str] = None,
     min_confidence: Optional[int] = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> list[EmailJobResponse]:
+) -> ORJSONResponse:
     """
     Get classified emails for current user.
     
@@ -251,27 +282,52 @@ async def get_classified_emails(
         category: Filter by classification category
         min_confidence: Minimum confidence percentage (0-100)
         limit: Number of results (max 100)
-        offset: Offset for pagination
+        cursor: Cursor from the previous page's X-Next-Cursor header
         
     Returns:
-        List of classified emails
+        List of classified emails; X-Next-Cursor is set when more may follow
     """
-    query = db.query(EmailJob).filter(
+    cache_key = response_cache_key(current_user.id, request)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Rows already have the EmailJobResponse shape, so skip per-row validation
+    # classified_at is the seek key; rows without it could neither be
+    # reached by the cursor nor produce one, so they are left out
+    stmt = select(*_EMAIL_JOB_RESPONSE_COLUMNS).where(
         EmailJob.user_id == current_user.id,
         EmailJob.classification.isnot(None),
+        EmailJob.classified_at.isnot(None),
     )
     
     if category:
-        query = query.filter(EmailJob.classification == category)
+        stmt = stmt.where(EmailJob.classification == category)
     
     if min_confidence is not None:
-        query = query.filter(
+        stmt = stmt.where(
             EmailJob.classification_confidence >= min_confidence
         )
     
-    # Order by classified_at descending, limit results
-    emails = query.order_by(
-        EmailJob.classified_at.desc()
-    ).limit(min(limit, 100)).offset(offset).all()
+    # Keyset pagination: seek past the last row served instead of OFFSET
+    if cursor:
+        stmt = stmt.where(
+            tuple_(EmailJob.classified_at, EmailJob.id) < decode_cursor(cursor)
+        )
+    
+    # Order by classified_at descending (id as tiebreak), limit results
+    page_size = min(limit, 100)
+    emails = db.execute(
+        stmt.order_by(EmailJob.classified_at.desc(), EmailJob.id.desc())
+        .limit(page_size)
+    ).mappings().all()
+    
+    headers = {}
+    if emails and len(emails) == page_size:
+        next_cursor = encode_cursor(emails[-1]["classified_at"], emails[-1]["id"])
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
     
-    return [EmailJobResponse.from_orm(email) for email in emails]
+    response = ORJSONResponse([dict(email) for email in emails], headers=headers)
+    cache_response(cache_key, response, headers=(NEXT_CURSOR_HEADER,))
+    return response
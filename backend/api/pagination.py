@@ -0,0 +1,47 @@
+"""
+Keyset pagination cursors for list endpoints.
+A cursor is an opaque token over the (sort timestamp, id) of the last row served.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+
+# Response header carrying the cursor for the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(sort_value: Optional[datetime], row_id: str) -> Optional[str]:
+    """
+    Encode the last row's sort key as a cursor.
+    
+    Args:
+        sort_value: Ordering timestamp of the last row
+        row_id: ID of the last row (tiebreak)
+        
+    Returns:
+        URL-safe cursor string, or None if the row has no sort value
+    """
+    if sort_value is None:
+        return None
+    raw = json.dumps([sort_value.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(sort_value), str(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor",
+        )
@@ -5,14 +5,28 @@ Provides endpoints to view and manage action recommendations.
 from datetime import datetime
 from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, tuple_, update
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
 
 from backend.dependencies import get_db, get_current_user
+from backend.database import dialect_insert
 from backend.models import User, EmailJob, ActionRecommendation
-from backend.worker.tasks.recommender import generate_recommendation, generate_recommendations_batch
-from backend.llm.rule_engine import create_rule_engine
+from backend.api.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from backend.response_cache import (
+    response_cache_key,
+    get_cached_response,
+    cache_response,
+    invalidate_user_responses,
+)
+from backend.worker.tasks.recommender import generate_recommendation
+from backend.worker.tasks.dispatch import dispatch_chunked
+from backend.llm.rule_engine import get_default_rule_engine
+
+# Upper bound on IDs per batch request, keeps broker fan-out bounded
+MAX_BATCH_SIZE = 500
 
 router = APIRouter(prefix="/api/v1/recommendation", tags=["recommendations"])
 
@@ -29,8 +43,7 @@ class RecommendedAction(BaseModel):
     priority: int
     reason: str
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class ActionRecommendationResponse(BaseModel):
@@ -46,8 +59,13 @@ class ActionRecommendationResponse(BaseModel):
     status: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Columns selected by list endpoints; rows map 1:1 onto ActionRecommendationResponse
+_RECOMMENDATION_LIST_COLUMNS = tuple(
+    getattr(ActionRecommendation, field) for field in ActionRecommendationResponse.model_fields
+)
 
 
 class GenerateRecommendationRequest(BaseModel):
@@ -59,7 +77,7 @@ class GenerateRecommendationRequest(BaseModel):
 class GenerateRecommendationsRequest(BaseModel):
     """Request to generate recommendations for multiple emails."""
     
-    email_job_ids: List[str]
+    email_job_ids: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
 
 
 class ReviewRecommendationRequest(BaseModel):
@@ -73,12 +91,17 @@ class ReviewRecommendationRequest(BaseModel):
 # Endpoints
 # ============================================================================
 
-@router.get("/email/{email_job_id}", response_model=Optional[ActionRecommendationResponse])
-async def get_recommendation(
+@router.get(
+    "/email/{email_job_id}",
+    response_model=None,
+    responses={200: {"model": Optional[ActionRecommendationResponse]}},
+)
+def get_recommendation(
     email_job_id: str,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> Optional[ActionRecommendationResponse]:
+) -> ORJSONResponse:
     """
     Get recommendation for an email.
     
@@ -88,29 +111,40 @@ async def get_recommendation(
     Returns:
         Recommendation details or null if none exists
     """
-    email_job = db.query(EmailJob).filter(
+    cache_key = response_cache_key(current_user.id, request)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+    
+    email_job_exists = db.query(EmailJob.id).filter(
         EmailJob.id == email_job_id,
         EmailJob.user_id == current_user.id,
-    ).first()
+    ).scalar()
     
-    if not email_job:
+    if not email_job_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Email job not found",
         )
     
+    # Pending rows are empty slots reserved while the task runs
     recommendation = db.query(ActionRecommendation).filter(
         ActionRecommendation.email_job_id == email_job_id,
         ActionRecommendation.user_id == current_user.id,
+        ActionRecommendation.status != "pending",
     ).first()
     
+    payload = None
     if recommendation:
-        return ActionRecommendationResponse.from_orm(recommendation)
-    return None
+        payload = ActionRecommendationResponse.model_validate(recommendation).model_dump()
+    
+    response = ORJSONResponse(payload)
+    cache_response(cache_key, response)
+    return response
 
 
 @router.post("/generate", response_model=dict)
-async def generate_recommendation_endpoint(
+def generate_recommendation_endpoint(
     request: GenerateRecommendationRequest,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -126,36 +160,57 @@ async def generate_recommendation_endpoint(
     Returns:
         Task ID for tracking
     """
-    # Verify email exists and belongs to user
-    email_job = db.query(EmailJob).filter(
+    # Verify email exists and belongs to user; fetch only the id
+    email_job_exists = db.query(EmailJob.id).filter(
         EmailJob.id == request.email_job_id,
         EmailJob.user_id == current_user.id,
-    ).first()
+    ).scalar()
     
-    if not email_job:
+    if not email_job_exists:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Email job not found",
         )
     
-    # Check if already has recommendation
-    existing = db.query(ActionRecommendation).filter(
-        ActionRecommendation.email_job_id == request.email_job_id
-    ).first()
-    
-    if existing:
+    # Atomically reserve the email's recommendation slot; only the request
+    # that inserts the pending row dispatches the task
+    stmt = dialect_insert(db, ActionRecommendation).values(
+        user_id=current_user.id,
+        email_job_id=request.email_job_id,
+        recommended_actions=[],
+        status="pending",
+    ).on_conflict_do_nothing(
+        index_elements=["email_job_id"],
+    ).returning(ActionRecommendation.id)
+    reserved = db.execute(stmt).first()
+    
+    if reserved is None:
+        db.rollback()
+        existing_id = db.query(ActionRecommendation.id).filter(
+            ActionRecommendation.email_job_id == request.email_job_id
+        ).scalar()
         return {
             "email_job_id": request.email_job_id,
-            "recommendation_id": existing.id,
+            "recommendation_id": existing_id,
             "status": "exists",
             "message": "Recommendation already exists",
         }
     
-    # Submit recommendation task
-    task = generate_recommendation.apply_async(
-        args=(request.email_job_id,),
-        kwargs={"user_context": {"user_id": current_user.id}},
-    )
+    db.commit()
+    
+    # Submit recommendation task; release the reservation if it can't be queued
+    try:
+        task = generate_recommendation.apply_async(
+            args=(request.email_job_id,),
+            kwargs={"user_context": {"user_id": current_user.id}},
+        )
+    except Exception:
+        db.query(ActionRecommendation).filter(
+            ActionRecommendation.id == reserved.id,
+            ActionRecommendation.status == "pending",
+        ).delete(synchronize_session=False)
+        db.commit()
+        raise
     
     return {
         "task_id": task.id,
@@ -165,9 +220,8 @@ async def generate_recommendation_endpoint(
 
 
 @router.post("/generate-batch", response_model=dict)
-async def generate_recommendations_endpoint(
+def generate_recommendations_endpoint(
     request: GenerateRecommendationsRequest,
-    db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> dict:
     """
@@ -177,35 +231,26 @@ async def generate_recommendations_endpoint(
         request: List of email job IDs
         
     Returns:
-        Task ID for tracking batch status
+        Group ID for tracking batch status
     """
-    # Verify all emails exist and belong to user
-    email_count = db.query(EmailJob).filter(
-        EmailJob.id.in_(request.email_job_ids),
-        EmailJob.user_id == current_user.id,
-    ).count()
-    
-    if email_count != len(request.email_job_ids):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Some email jobs not found",
-        )
-    
-    # Submit batch recommendation task
-    task = generate_recommendations_batch.apply_async(
-        args=(request.email_job_ids,),
-        kwargs={"user_context": {"user_id": current_user.id}},
+    # No ownership query here: each task loads its email filtered by
+    # user_context, so IDs the user doesn't own come back as
+    # "EmailJob not found" in the group results
+    job = dispatch_chunked(
+        generate_recommendation,
+        request.email_job_ids,
+        user_context={"user_id": current_user.id},
     )
     
     return {
-        "task_id": task.id,
+        "task_id": job.id,
         "email_count": len(request.email_job_ids),
         "status": "submitted",
     }
 
 
 @router.patch("/{recommendation_id}/review", response_model=dict)
-async def review_recommendation(
+def review_recommendation(
     recommendation_id: str,
     request: ReviewRecommendationRequest,
     db: Session = Depends(get_db),
@@ -223,35 +268,55 @@ async def review_recommendation(
     Returns:
         Updated recommendation
     """
-    recommendation = db.query(ActionRecommendation).filter(
-        ActionRecommendation.id == recommendation_id,
-        ActionRecommendation.user_id == current_user.id,
-    ).first()
-    
-    if not recommendation:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Recommendation not found",
-        )
-    
-    # Update status
+    # Build the new review state; naive UTC like every other timestamp
+    now = datetime.utcnow()
     if request.status == "accepted":
-        recommendation.status = "accepted"
-        recommendation.accepted_at = datetime.utcnow()
-        recommendation.rejected_at = None
-        recommendation.rejection_reason = None
+        values = {
+            "status": "accepted",
+            "accepted_at": now,
+            "rejected_at": None,
+            "rejection_reason": None,
+        }
     elif request.status == "rejected":
-        recommendation.status = "rejected"
-        recommendation.rejected_at = datetime.utcnow()
-        recommendation.rejection_reason = request.rejection_reason
-        recommendation.accepted_at = None
+        values = {
+            "status": "rejected",
+            "rejected_at": now,
+            "rejection_reason": request.rejection_reason,
+            "accepted_at": None,
+        }
     else:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid status. Must be 'accepted' or 'rejected'.",
         )
     
+    # Ownership check and update in one round-trip
+    stmt = (
+        update(ActionRecommendation)
+        .where(
+            ActionRecommendation.id == recommendation_id,
+            ActionRecommendation.user_id == current_user.id,
+        )
+        .values(**values)
+        .returning(
+            ActionRecommendation.id,
+            ActionRecommendation.status,
+            ActionRecommendation.accepted_at,
+            ActionRecommendation.rejected_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    recommendation = db.execute(stmt).first()
+    
+    if recommendation is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Recommendation not found",
+        )
+    
     db.commit()
+    invalidate_user_responses(current_user.id)
     
     return {
         "id": recommendation.id,
@@ -261,15 +326,20 @@ async def review_recommendation(
     }
 
 
-@router.get("/", response_model=List[ActionRecommendationResponse])
-async def list_recommendations(
+@router.get(
+    "/",
+    response_model=None,
+    responses={200: {"model": List[ActionRecommendationResponse]}},
+)
+def list_recommendations(
+    request: Request,
     status_filter: Optional[str] = None,
     min_confidence: Optional[int] = None,
     limit: int = 50,
-    offset: int = 0,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
-) -> List[ActionRecommendationResponse]:
+) -> ORJSONResponse:
     """
     List recommendations for current user.
     
@@ -277,28 +347,53 @@ async def list_recommendations(
         status_filter: Filter by status (generated, reviewed, accepted, rejected)
         min_confidence: Minimum confidence threshold (0-100)
         limit: Number of results (max 100)
-        offset: Offset for pagination
+        cursor: Cursor from the previous page's X-Next-Cursor header
         
     Returns:
-        List of recommendations
+        List of recommendations; X-Next-Cursor is set when more may follow
     """
-    query = db.query(ActionRecommendation).filter(
+    cache_key = response_cache_key(current_user.id, request)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Select just the response columns; rows already have the
+    # ActionRecommendationResponse shape, so skip per-row pydantic validation
+    stmt = select(*_RECOMMENDATION_LIST_COLUMNS).where(
         ActionRecommendation.user_id == current_user.id,
+        ActionRecommendation.status != "pending",
     )
     
     if status_filter:
-        query = query.filter(ActionRecommendation.status == status_filter)
+        stmt = stmt.where(ActionRecommendation.status == status_filter)
     
     if min_confidence is not None:
-        query = query.filter(
+        stmt = stmt.where(
             ActionRecommendation.confidence_score >= min_confidence
         )
     
-    recommendations = query.order_by(
-        ActionRecommendation.created_at.desc()
-    ).limit(min(limit, 100)).offset(offset).all()
+    # Keyset pagination: seek past the last row served instead of OFFSET
+    if cursor:
+        stmt = stmt.where(
+            tuple_(ActionRecommendation.created_at, ActionRecommendation.id)
+            < decode_cursor(cursor)
+        )
     
-    return [ActionRecommendationResponse.from_orm(r) for r in recommendations]
+    page_size = min(limit, 100)
+    recommendations = db.execute(
+        stmt.order_by(ActionRecommendation.created_at.desc(), ActionRecommendation.id.desc())
+        .limit(page_size)
+    ).mappings().all()
+    
+    headers = {}
+    if recommendations and len(recommendations) == page_size:
+        next_cursor = encode_cursor(recommendations[-1]["created_at"], recommendations[-1]["id"])
+        if next_cursor:
+            headers[NEXT_CURSOR_HEADER] = next_cursor
+    
+    response = ORJSONResponse([dict(r) for r in recommendations], headers=headers)
+    cache_response(cache_key, response, headers=(NEXT_CURSOR_HEADER,))
+    return response
 
 
 @router.post("/test-rules", response_model=dict)
@@ -326,7 +421,7 @@ async def test_rules(
         Evaluation result with matched rules and actions
     """
     try:
-        engine = create_rule_engine()
+        engine = get_default_rule_engine()
         
         evaluation = engine.evaluate(
             classification=classification,
@@ -25,6 +25,13 @@ class Settings(BaseSettings):
     postgres_db: str = "va_scheduler"
     postgres_user: str = "postgres"
     postgres_password: str = "postgres"
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30  # seconds to wait for a free pooled connection
+    db_pool_recycle: int = 1800  # seconds before a connection is replaced
+    db_pool_use_lifo: bool = True  # reuse the most recently returned connection first
+    db_statement_timeout_ms: int = 0  # server-side statement timeout, 0 disables
+    db_query_cache_size: int = 1200  # compiled SQL statements cached per engine
 
     @property
     def database_url(self) -> str:
@@ -42,6 +49,8 @@ class Settings(BaseSettings):
     openai_api_key: str = ""
     openai_model: str = "gpt-3.5-turbo"
     openai_temperature: float = 0.7
+    openai_max_concurrency: int = 8  # concurrent LLM calls in async batch classification
+    classify_cache_size: int = 4096  # cached results per classifier; used only at temperature <= 0.1
     
     # Email Classification Categories (as JSON string)
     # Default categories if not provided
@@ -56,6 +65,9 @@ class Settings(BaseSettings):
         '}'
     )
     classification_confidence_threshold: float = 0.6  # Min confidence to store classification
+    # Senders classified without calling the LLM, as JSON {pattern: category}.
+    # Patterns: "user@domain", "*@domain" (includes subdomains), "user@*"
+    sender_category_rules: str = "{}"
 
     # Gmail OAuth2
     gmail_client_id: str = ""
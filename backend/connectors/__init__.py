@@ -1,10 +1,18 @@
 """
 Initialize connectors package.
+Connector classes are imported on first access so importing the package
+doesn't pull in the Google client libraries.
 """
-from .gmail import GmailConnector, OutlookConnector, EmailConnectorFactory
 
 __all__ = [
     "GmailConnector",
     "OutlookConnector",
     "EmailConnectorFactory",
 ]
+
+
+def __getattr__(name):
+    if name in __all__:
+        from . import gmail
+        return getattr(gmail, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -4,15 +4,154 @@ Handles Gmail authentication and email fetching.
 """
 from typing import Optional, Dict, Any, List
 import logging
-from datetime import datetime
-import base64
+import time
+from datetime import datetime, timezone
+import binascii
 import json
+import weakref
+import hashlib
+import html
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from google_auth_oauthlib.flow import Flow
 from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
+from google_auth_httplib2 import AuthorizedHttp
+from cachetools import TTLCache
+import httplib2
 
 logger = logging.getLogger(__name__)
 
+# Gmail accepts up to 100 calls per batch but rate-limits batches above 50
+GMAIL_BATCH_SIZE = 50
+# Concurrent batches per fetch; kept low to stay inside the per-user quota
+GMAIL_BATCH_WORKERS = 5
+
+# Largest page messages.list will return
+GMAIL_LIST_PAGE_SIZE = 100
+
+# Headers requested when fetching message metadata only
+METADATA_HEADERS = ["Subject", "From", "To", "Cc", "Date"]
+
+# Built services are reused per access token; Google access tokens live an hour
+GMAIL_SERVICE_CACHE_SIZE = 128
+GMAIL_SERVICE_TTL = 3600
+
+# Refresh cached access tokens this many seconds before they expire
+TOKEN_REFRESH_MARGIN = 60
+
+# Accounts whose access token (and refresh lock) is kept between calls;
+# Google access tokens live an hour, so older entries are useless
+GMAIL_TOKEN_CACHE_SIZE = 1024
+GMAIL_TOKEN_TTL = 3600
+
+# Socket timeout, in seconds, for Gmail API calls
+GMAIL_HTTP_TIMEOUT = 60
+
+# Gmail bodies are URL-safe base64, often unpadded
+_B64_TRANS = str.maketrans("-_", "+/")
+
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_HTML_SKIP_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+
+_service_cache = TTLCache(maxsize=GMAIL_SERVICE_CACHE_SIZE, ttl=GMAIL_SERVICE_TTL)
+_service_lock = threading.Lock()
+_thread_local = threading.local()
+
+# Long-lived workers, so each keeps its transport (and connections) between fetches
+_batch_executor = ThreadPoolExecutor(
+    max_workers=GMAIL_BATCH_WORKERS,
+    thread_name_prefix="gmail-batch",
+)
+
+
+def _get_service(access_token: str):
+    """
+    Return a Gmail service for an access token, building it on first use.
+    
+    Building parses the discovery document, so services are cached by token hash.
+    Execute requests with _authorized_http rather than the service's own
+    transport, which is not safe to share between threads.
+    """
+    key = hashlib.sha256(access_token.encode()).hexdigest()[:32]
+    with _service_lock:
+        service = _service_cache.get(key)
+    if service is None:
+        service = build(
+            "gmail",
+            "v1",
+            credentials=Credentials(token=access_token),
+            cache_discovery=False,
+            static_discovery=True,
+        )
+        with _service_lock:
+            _service_cache[key] = service
+    return service
+
+
+def _decode_body(data: str) -> str:
+    """
+    Decode a Gmail body part to text.
+    
+    Translates the URL-safe alphabet in one pass and decodes with binascii
+    directly, skipping the extra copy urlsafe_b64decode makes. Bad UTF-8 is
+    replaced rather than failing the whole message.
+    """
+    raw = binascii.a2b_base64(data.translate(_B64_TRANS) + "=" * (-len(data) % 4))
+    return raw.decode("utf-8", errors="replace")
+
+
+def _extract_body(payload: Dict[str, Any]) -> str:
+    """
+    Return the text body of a message payload, searching nested multiparts.
+    
+    The first text/plain part wins; otherwise the first text/html part is
+    stripped of tags. Parts are walked with an explicit stack in document order.
+    """
+    stack = [payload]
+    html_data = None
+    while stack:
+        part = stack.pop()
+        mime_type = part.get("mimeType", "")
+        data = part.get("body", {}).get("data")
+        if data:
+            if mime_type == "text/plain":
+                return _decode_body(data)
+            if mime_type == "text/html" and html_data is None:
+                html_data = data
+        stack.extend(reversed(part.get("parts", ())))
+    
+    if html_data is None:
+        return ""
+    text = _HTML_SKIP_RE.sub("", _decode_body(html_data))
+    return html.unescape(_HTML_TAG_RE.sub("", text)).strip()
+
+
+def _token_expiry(expiry: datetime) -> Dict[str, Any]:
+    """
+    Return expires_in/expires_at for a credentials expiry (naive UTC).
+    
+    expires_in comes from epoch seconds, so no datetime is built for "now".
+    """
+    return {
+        "expires_in": max(0, int(expiry.replace(tzinfo=timezone.utc).timestamp() - time.time())),
+        "expires_at": expiry.isoformat(),
+    }
+
+
+def _authorized_http(access_token: str) -> AuthorizedHttp:
+    """
+    Return an authorized transport for executing one call or batch.
+    
+    The underlying httplib2.Http is kept per thread, so keep-alive connections
+    to googleapis.com are reused across calls without being shared between threads.
+    """
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = _thread_local.http = httplib2.Http(timeout=GMAIL_HTTP_TIMEOUT)
+    return AuthorizedHttp(Credentials(token=access_token), http=http)
+
 
 class GmailConnector:
     """
@@ -25,6 +164,14 @@ class GmailConnector:
     - Email operations (flag, archive, etc.)
     """
 
+    __slots__ = ("client_id", "client_secret", "redirect_uri", "scopes", "client_config", "__weakref__")
+
+    # (access token, expires_at, epoch deadline) keyed by refresh-token hash,
+    # shared by every connector; both caches are guarded by _token_lock
+    _token_cache = TTLCache(maxsize=GMAIL_TOKEN_CACHE_SIZE, ttl=GMAIL_TOKEN_TTL)
+    _refresh_locks = TTLCache(maxsize=GMAIL_TOKEN_CACHE_SIZE, ttl=GMAIL_TOKEN_TTL)
+    _token_lock = threading.Lock()
+
     def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
         """
         Initialize Gmail connector.
@@ -94,8 +241,7 @@ class GmailConnector:
         return {
             "access_token": credentials.token,
             "refresh_token": credentials.refresh_token,
-            "expires_in": int((credentials.expiry - datetime.utcnow()).total_seconds()),
-            "expires_at": credentials.expiry.isoformat(),
+            **_token_expiry(credentials.expiry),
         }
 
     def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
@@ -126,16 +272,56 @@ class GmailConnector:
         return {
             "access_token": credentials.token,
             "refresh_token": credentials.refresh_token,
-            "expires_in": int((credentials.expiry - datetime.utcnow()).total_seconds()),
-            "expires_at": credentials.expiry.isoformat(),
+            **_token_expiry(credentials.expiry),
         }
 
+    def ensure_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """
+        Return a valid access token, refreshing only when the cached one is near expiry.
+        
+        Concurrent callers with the same refresh token wait on a single refresh
+        instead of each hitting the token endpoint.
+        
+        Args:
+            refresh_token: Refresh token from previous auth
+            
+        Returns:
+            Access token and expiration, as from refresh_access_token
+        """
+        key = hashlib.sha256(refresh_token.encode()).hexdigest()[:32]
+        with GmailConnector._token_lock:
+            refresh_lock = GmailConnector._refresh_locks.setdefault(key, threading.Lock())
+        
+        with refresh_lock:
+            with GmailConnector._token_lock:
+                cached = GmailConnector._token_cache.get(key)
+            if cached is not None:
+                access_token, expires_at, deadline = cached
+                remaining = deadline - time.time()
+                if remaining > TOKEN_REFRESH_MARGIN:
+                    return {
+                        "access_token": access_token,
+                        "refresh_token": refresh_token,
+                        "expires_in": int(remaining),
+                        "expires_at": expires_at,
+                    }
+            
+            token_data = self.refresh_access_token(refresh_token)
+            with GmailConnector._token_lock:
+                GmailConnector._token_cache[key] = (
+                    token_data["access_token"],
+                    token_data["expires_at"],
+                    time.time() + token_data["expires_in"],
+                )
+            return token_data
 
     def fetch_emails(
         self,
         access_token: str,
         max_results: int = 10,
         query: str = "is:unread",
+        include_body: bool = False,
+        page_size: int = GMAIL_LIST_PAGE_SIZE,
     ) -> List[Dict[str, Any]]:
         """
         Fetch emails from Gmail inbox.
@@ -144,77 +330,148 @@ class GmailConnector:
             access_token: Valid Gmail access token
             max_results: Maximum number of emails to fetch
             query: Gmail search query (default: unread emails)
+            include_body: Download full messages and decode bodies; otherwise
+                only headers are fetched and use get_email_body for content
+            page_size: Message IDs requested per list call, following
+                nextPageToken until max_results are collected
             
         Returns:
             List of email dictionaries with metadata
         """
         try:
-            # Create Gmail service with access token
-            service = build(
-                "gmail",
-                "v1",
-                credentials=Credentials(token=access_token),
-            )
+            service = _get_service(access_token)
             
-            # List messages matching query
-            results = service.users().messages().list(
-                userId="me",
-                q=query,
-                maxResults=max_results,
-                fields="messages(id,threadId)",
-            ).execute()
+            http = _authorized_http(access_token)
+            page_size = max(1, min(page_size, GMAIL_LIST_PAGE_SIZE))
+            
+            # List messages matching query, one page at a time
+            message_ids = []
+            page_token = None
+            while len(message_ids) < max_results:
+                results = service.users().messages().list(
+                    userId="me",
+                    q=query,
+                    maxResults=min(page_size, max_results - len(message_ids)),
+                    pageToken=page_token,
+                    fields="messages(id),nextPageToken",
+                ).execute(http=http)
+                message_ids.extend(m["id"] for m in results.get("messages", []))
+                page_token = results.get("nextPageToken")
+                if not page_token:
+                    break
             
-            messages = results.get("messages", [])
-            logger.info(f"Fetched {len(messages)} messages from Gmail")
+            logger.info(f"Fetched {len(message_ids)} messages from Gmail")
             
-            emails = []
-            for message in messages:
-                email_data = self._parse_message(service, message["id"])
-                if email_data:
-                    emails.append(email_data)
+            chunks = [
+                message_ids[start:start + GMAIL_BATCH_SIZE]
+                for start in range(0, len(message_ids), GMAIL_BATCH_SIZE)
+            ]
             
-            return emails
+            # Batches are network-bound, so overlap them instead of running in series
+            parsed = {}
+            futures = [
+                _batch_executor.submit(self._execute_batch, chunk, access_token, include_body)
+                for chunk in chunks
+            ]
+            for future in as_completed(futures):
+                parsed.update(future.result())
+            
+            return [parsed[m_id] for m_id in message_ids if m_id in parsed]
             
         except Exception as e:
             logger.error(f"Error fetching emails from Gmail: {e}")
             raise
 
-    def _parse_message(self, service, message_id: str) -> Optional[Dict[str, Any]]:
+    def _execute_batch(
+        self,
+        message_ids: List[str],
+        access_token: str,
+        include_body: bool = False,
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Parse full message content from Gmail API.
+        Fetch and parse a chunk of messages in one batch HTTP request.
+        
+        Runs on its own HTTP transport, since httplib2 connections are not
+        thread-safe; the cached service is only used to build requests.
+        
+        Args:
+            message_ids: Gmail message IDs (at most GMAIL_BATCH_SIZE)
+            access_token: Valid Gmail access token
+            include_body: Fetch full messages instead of headers only
+            
+        Returns:
+            Parsed email data keyed by message ID
+        """
+        service = _get_service(access_token)
+        parsed = {}
+        parse = self._parse_full if include_body else self._parse_metadata
+        
+        def on_message(request_id, response, exception):
+            if exception is not None:
+                logger.error(f"Error fetching message {request_id}: {exception}")
+                return
+            email_data = parse(response)
+            if email_data:
+                parsed[request_id] = email_data
+        
+        batch = service.new_batch_http_request(callback=on_message)
+        for message_id in message_ids:
+            if include_body:
+                request = service.users().messages().get(
+                    userId="me",
+                    id=message_id,
+                    format="full",
+                )
+            else:
+                request = service.users().messages().get(
+                    userId="me",
+                    id=message_id,
+                    format="metadata",
+                    metadataHeaders=METADATA_HEADERS,
+                    fields="id,threadId,labelIds,payload/headers",
+                )
+            batch.add(request, request_id=message_id)
+        batch.execute(http=_authorized_http(access_token))
+        return parsed
+
+    def _parse_message(self, access_token: str, message_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and parse a single message from Gmail API.
         
         Args:
-            service: Gmail service instance
+            access_token: Valid Gmail access token
             message_id: Gmail message ID
             
         Returns:
             Dictionary with parsed email data
         """
         try:
-            message = service.users().messages().get(
+            message = _get_service(access_token).users().messages().get(
                 userId="me",
                 id=message_id,
                 format="full",
-            ).execute()
+            ).execute(http=_authorized_http(access_token))
+            return self._parse_full(message)
+        except Exception as e:
+            logger.error(f"Error fetching message {message_id}: {e}")
+            return None
+
+    @staticmethod
+    def _parse_metadata(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Parse headers and labels from a Gmail API message resource.
+        
+        Args:
+            message: Message resource as returned by messages.get
             
+        Returns:
+            Dictionary with parsed email data (body left empty)
+        """
+        message_id = message.get("id")
+        try:
             headers = message["payload"]["headers"]
             headers_dict = {h["name"]: h["value"] for h in headers}
-            
-            # Extract body
-            body = ""
-            if "parts" in message["payload"]:
-                for part in message["payload"]["parts"]:
-                    if part["mimeType"] == "text/plain":
-                        if "data" in part["body"]:
-                            body = base64.urlsafe_b64decode(
-                                part["body"]["data"]
-                            ).decode("utf-8")
-                            break
-            else:
-                if "data" in message["payload"]["body"]:
-                    body = base64.urlsafe_b64decode(
-                        message["payload"]["body"]["data"]
-                    ).decode("utf-8")
+            labels = message.get("labelIds", [])
             
             return {
                 "message_id": message_id,
@@ -224,109 +481,36 @@ class GmailConnector:
                 "to": headers_dict.get("To", ""),
                 "cc": headers_dict.get("Cc", ""),
                 "date": headers_dict.get("Date", ""),
-                "body": body,
-                "labels": message.get("labelIds", []),
-                "is_unread": "UNREAD" in message.get("labelIds", []),
+                "body": "",
+                "labels": labels,
+                "is_unread": "UNREAD" in labels,
             }
             
         except Exception as e:
             logger.error(f"Error parsing message {message_id}: {e}")
             return None
 
-    def get_email_body(self, access_token: str, message_id: str) -> str:
+    @classmethod
+    def _parse_full(cls, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        Get full email body/content.
+        Parse a full Gmail API message resource, including its body.
         
         Args:
-            access_token: Valid Gmail access token
-            message_id: Gmail message ID
+            message: Message resource fetched with format="full"
             
         Returns:
-            Email body text
+            Dictionary with parsed email data
         """
+        email_data = cls._parse_metadata(message)
+        if email_data is None:
+            return None
         try:
-            service = build(
-                "gmail",
-                "v1",
-                credentials=Credentials(token=access_token),
-            )
-            email = self._parse_message(service, message_id)
-            return email["body"] if email else ""
-        except Exception as e:
-            logger.error(f"Error getting email body: {e}")
-            return ""
-
-    def send_email(
-        self,
-        access_token: str,
-        to: str,
-        subject: str,
-        body: str,
-        in_reply_to: Optional[str] = None,
-    ) -> str:
-        """
-        Send an email via Gmail.
-        
-        Args:
-            access_token: Valid Gmail access token
-            to: Recipient email address
-            subject: Email subject
-            body: Email body (HTML or plain text)
-            in_reply_to: Optional message ID to reply to
-            
-        Returns:
-            Sent message ID
-        """
-        # To be implemented in Phase B (not part of MVP)
-        raise NotImplementedError("To be implemented in Phase B")
-
-    def label_email(
-        self,
-        access_token: str,
-        message_id: str,
-        labels: list,
-    ) -> bool:
-        """
-        Apply labels/tags to an email.
-        
-        Args:
-            access_token: Valid Gmail access token
-            message_id: Gmail message ID
-            labels: List of label names
-            
-        Returns:
-            Success status
-        """
-        # To be implemented in Phase B (not part of MVP)
-        raise NotImplementedError("To be implemented in Phase B")
-
-    def archive_email(self, access_token: str, message_id: str) -> bool:
-        """
-        Archive an email (remove from inbox).
-        
-        Args:
-            access_token: Valid Gmail access token
-            message_id: Gmail message ID
-            
-        Returns:
-            Success status
-        """
-        # To be implemented in Phase B (not part of MVP)
-        raise NotImplementedError("To be implemented in Phase B")
-
-    def star_email(self, access_token: str, message_id: str) -> bool:
-        """
-        Star/flag an email.
-        
-        Args:
-            access_token: Valid Gmail access token
-            message_id: Gmail message ID
+            email_data["body"] = _extract_body(message["payload"])
+            return email_data
             
-        Returns:
-            Success status
-        """
-        # To be implemented in Phase B (not part of MVP)
-        raise NotImplementedError("To be implemented in Phase B")
+        except Exception as e:
+            logger.error(f"Error parsing message {email_data['message_id']}: {e}")
+            return None
 
     def get_email_body(self, access_token: str, message_id: str) -> str:
         """
@@ -339,8 +523,12 @@ class GmailConnector:
         Returns:
             Email body text
         """
-        # To be implemented in Phase B
-        raise NotImplementedError("To be implemented in Phase B")
+        try:
+            email = self._parse_message(access_token, message_id)
+            return email["body"] if email else ""
+        except Exception as e:
+            logger.error(f"Error getting email body: {e}")
+            return ""
 
     def send_email(
         self,
@@ -363,7 +551,7 @@ class GmailConnector:
         Returns:
             Sent message ID
         """
-        # To be implemented in Phase B
+        # To be implemented in Phase B (not part of MVP)
         raise NotImplementedError("To be implemented in Phase B")
 
     def label_email(
@@ -383,7 +571,7 @@ class GmailConnector:
         Returns:
             Success status
         """
-        # To be implemented in Phase B
+        # To be implemented in Phase B (not part of MVP)
         raise NotImplementedError("To be implemented in Phase B")
 
     def archive_email(self, access_token: str, message_id: str) -> bool:
@@ -397,7 +585,7 @@ class GmailConnector:
         Returns:
             Success status
         """
-        # To be implemented in Phase B
+        # To be implemented in Phase B (not part of MVP)
         raise NotImplementedError("To be implemented in Phase B")
 
     def star_email(self, access_token: str, message_id: str) -> bool:
@@ -411,7 +599,7 @@ class GmailConnector:
         Returns:
             Success status
         """
-        # To be implemented in Phase B
+        # To be implemented in Phase B (not part of MVP)
         raise NotImplementedError("To be implemented in Phase B")
 
 
@@ -422,6 +610,8 @@ class OutlookConnector:
     Handles Outlook/Microsoft Graph API integration.
     """
 
+    __slots__ = ("client_id", "client_secret", "redirect_uri", "__weakref__")
+
     def __init__(self, client_id: str, client_secret: str, redirect_uri: str):
         """Initialize Outlook connector."""
         self.client_id = client_id
@@ -462,6 +652,10 @@ class EmailConnectorFactory:
         "outlook": OutlookConnector,
     }
 
+    # Connectors hold only static config, so equal configs share one instance
+    # for as long as any caller keeps it alive
+    _instance_cache = weakref.WeakValueDictionary()
+
     @classmethod
     def create(cls, provider: str, **kwargs) -> Any:
         """
@@ -472,7 +666,7 @@ class EmailConnectorFactory:
             **kwargs: Provider-specific configuration
             
         Returns:
-            Connector instance
+            Connector instance (shared across calls with the same config)
             
         Raises:
             ValueError: If provider not supported
@@ -483,8 +677,12 @@ class EmailConnectorFactory:
                 f"Supported: {list(cls._connectors.keys())}"
             )
 
-        connector_class = cls._connectors[provider]
-        return connector_class(**kwargs)
+        key = (provider, tuple(sorted(kwargs.items())))
+        connector = cls._instance_cache.get(key)
+        if connector is None:
+            connector = cls._connectors[provider](**kwargs)
+            cls._instance_cache[key] = connector
+        return connector
 
     @classmethod
     def register(cls, provider: str, connector_class):
@@ -496,6 +694,9 @@ class EmailConnectorFactory:
             connector_class: Connector class
         """
         cls._connectors[provider] = connector_class
+        # Drop shared instances built from a previously registered class
+        for key in [k for k in list(cls._instance_cache.keys()) if k[0] == provider]:
+            cls._instance_cache.pop(key, None)
 
     @classmethod
     def get_supported_providers(cls) -> list:
@@ -1,22 +1,39 @@
 """
 Database session factory and utilities.
 """
+import logging
 from typing import Generator
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import sessionmaker, Session
 from config import settings
 
+logger = logging.getLogger(__name__)
+
+# Bound tail latency from runaway queries when configured
+connect_args = {}
+if settings.db_statement_timeout_ms:
+    connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
 # Create database engine
 engine = create_engine(
     settings.database_url,
     echo=settings.debug,
     pool_pre_ping=True,  # Verify connections before using
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    # Hot connections keep their server-side caches warm; idle ones can be recycled
+    pool_use_lifo=settings.db_pool_use_lifo,
+    # Reuse compiled SQL for repeated query shapes (e.g. lookups by id + user_id)
+    query_cache_size=settings.db_query_cache_size,
+    connect_args=connect_args,
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Session factory. Objects stay loaded after commit so handlers can keep
+# reading them (e.g. the current user) without a re-SELECT.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -31,6 +48,42 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def dialect_insert(db: Session, model):
+    """
+    Return an INSERT construct that supports ON CONFLICT for the session's
+    dialect (PostgreSQL in deployment, SQLite in tests).
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
+def warm_pool() -> None:
+    """
+    Open every pooled connection up front so the first requests after boot
+    don't pay the connect/auth handshake.
+    """
+    connections = []
+    try:
+        for _ in range(settings.db_pool_size):
+            conn = engine.connect()
+            conn.execute(text("SELECT 1"))
+            connections.append(conn)
+    except Exception as e:
+        logger.warning(f"Connection pool warm-up stopped early: {e}")
+    finally:
+        # Closing returns each connection to the pool, still open
+        for conn in connections:
+            conn.close()
+    logger.info(f"Warmed {len(connections)} pooled database connections")
+
+
+def dispose_pool() -> None:
+    """Close every pooled connection, e.g. on application shutdown."""
+    engine.dispose()
+    logger.info("Closed pooled database connections")
+
+
 def init_db():
     """Initialize database tables."""
     # Import models to register them with Base.metadata
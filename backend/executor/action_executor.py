@@ -10,12 +10,14 @@ ActionRecommendation objects. It does NOT execute actions; it only:
 
 Actual execution (calling Gmail API, etc.) is deferred to a future phase.
 """
+from collections import defaultdict
 from typing import Dict, Any, List, Optional
+import json
 import logging
 
 from backend.executor.allowed_actions import (
     is_action_type_allowed,
-    get_required_fields,
+    ACTION_REQUIRED_FIELDSETS,
     ACTION_OPTIONAL_FIELDS,
 )
 from backend.executor.execution_plan import (
@@ -74,29 +76,24 @@ class ActionExecutor:
             self.logger.warning("validate_action: empty action")
             return False
         
-        # Check if type field exists
-        if "type" not in action:
-            self.logger.warning("validate_action: missing 'type' field")
-            return False
-        
-        action_type = action["type"]
-        
-        # Check if action type is allowed
+        # A missing type is rejected along with disallowed ones
+        action_type = action.get("type")
         if not is_action_type_allowed(action_type):
             self.logger.warning(
-                f"validate_action: action type '{action_type}' not allowed"
+                "validate_action: action type '%s' not allowed", action_type
             )
             return False
         
         # Check required fields
-        required_fields = get_required_fields(action_type)
-        for field in required_fields:
-            if field not in action:
-                self.logger.warning(
-                    f"validate_action: missing required field '{field}' "
-                    f"for action type '{action_type}'"
-                )
-                return False
+        missing = ACTION_REQUIRED_FIELDSETS[action_type] - action.keys()
+        if missing:
+            self.logger.warning(
+                "validate_action: missing required field(s) %s "
+                "for action type '%s'",
+                sorted(missing),
+                action_type,
+            )
+            return False
         
         return True
     
@@ -125,6 +122,42 @@ class ActionExecutor:
         # All valid allowed actions are approved in this phase
         return ExecutionDecision.APPROVED
     
+    def decide_eligibility_batch(
+        self,
+        actions: List[Dict[str, Any]],
+    ) -> List[ExecutionDecision]:
+        """
+        Decide eligibility for a list of actions at once.
+        
+        Actions are grouped by type so each group is checked against one
+        required-field set. Only rejected actions go through validate_action,
+        which logs why they were blocked.
+        
+        Args:
+            actions: Action specification dicts
+        
+        Returns:
+            One ExecutionDecision per action, in input order
+        """
+        decisions = [ExecutionDecision.BLOCKED] * len(actions)
+        
+        by_type = defaultdict(list)
+        for index, action in enumerate(actions):
+            if action and is_action_type_allowed(action.get("type")):
+                by_type[action["type"]].append(index)
+        
+        for action_type, indices in by_type.items():
+            required = ACTION_REQUIRED_FIELDSETS[action_type]
+            for index in indices:
+                if required <= actions[index].keys():
+                    decisions[index] = ExecutionDecision.APPROVED
+        
+        for action, decision in zip(actions, decisions):
+            if decision is ExecutionDecision.BLOCKED:
+                self.validate_action(action)
+        
+        return decisions
+    
     def plan_execution(
         self,
         recommendation: Any,
@@ -151,25 +184,29 @@ class ActionExecutor:
             reasoning=self._generate_reasoning(recommendation, actions),
         )
         
-        # Evaluate each action
-        for action in actions:
-            decision = self.decide_eligibility(action)
+        # Evaluate all actions, then record each decision
+        decisions = self.decide_eligibility_batch(actions)
+        for action, decision in zip(actions, decisions):
             reasoning = self._generate_step_reasoning(action, decision)
             
             plan.add_step(action, decision, reasoning)
             
             # Log each decision
             self.logger.info(
-                f"Action eligibility: {action.get('type')} -> {decision.value} "
-                f"(rec={recommendation.id})"
+                "Action eligibility: %s -> %s (rec=%s)",
+                action.get("type"),
+                decision.value,
+                recommendation.id,
             )
         
-        # Log plan creation
-        self.logger.info(
-            f"ExecutionPlan created for recommendation {recommendation.id}: "
-            f"{len(plan.get_approved_actions())} approved, "
-            f"{len(plan.get_blocked_actions())} blocked"
-        )
+        # Log plan creation; copying the step lists is skipped when INFO is off
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "ExecutionPlan created for recommendation %s: %d approved, %d blocked",
+                recommendation.id,
+                len(plan.get_approved_actions()),
+                len(plan.get_blocked_actions()),
+            )
         
         return plan
     
@@ -188,21 +225,28 @@ class ActionExecutor:
         Returns:
             Reasoning string
         """
-        import json
-        
         num_actions = len(actions)
         sim_marker = "[SIMULATION] " if self.simulation_mode else ""
         
-        # Handle rule_names that might be JSON string or list
-        rule_names = recommendation.rule_names
-        if isinstance(rule_names, str):
-            try:
-                rule_names = json.loads(rule_names)
-            except (json.JSONDecodeError, TypeError):
-                rule_names = [rule_names]
-        
-        if not isinstance(rule_names, list):
-            rule_names = [str(rule_names)]
+        # ActionRecommendation parses rule_names once; other objects carry the
+        # raw value, which might be a JSON string, comma-separated names or a list
+        rule_names = getattr(recommendation, "rule_name_list", None)
+        if rule_names is None:
+            rule_names = recommendation.rule_names
+            if isinstance(rule_names, str):
+                try:
+                    rule_names = json.loads(rule_names)
+                except (json.JSONDecodeError, TypeError):
+                    rule_names = None
+                if not isinstance(rule_names, list):
+                    rule_names = [
+                        name.strip()
+                        for name in recommendation.rule_names.split(",")
+                        if name.strip()
+                    ]
+            
+            if not isinstance(rule_names, list):
+                rule_names = [str(rule_names)]
         
         reasoning = (
             f"{sim_marker}Plan for {num_actions} recommended action(s) "
@@ -229,13 +273,13 @@ class ActionExecutor:
         """
         action_type = action.get("type", "unknown")
         
-        if decision == ExecutionDecision.APPROVED:
+        if decision is ExecutionDecision.APPROVED:
             priority = action.get("priority", "default")
             reason = action.get("reason", "")
             detail = f" (priority={priority})" if priority else ""
             return f"Action '{action_type}' is allowed and approved{detail}"
         
-        elif decision == ExecutionDecision.BLOCKED:
+        elif decision is ExecutionDecision.BLOCKED:
             if not is_action_type_allowed(action_type):
                 return (
                     f"Action type '{action_type}' is not in allowed list. "
@@ -244,7 +288,7 @@ class ActionExecutor:
             else:
                 return f"Action '{action_type}' failed validation. Blocked."
         
-        elif decision == ExecutionDecision.REQUIRES_APPROVAL:
+        elif decision is ExecutionDecision.REQUIRES_APPROVAL:
             return f"Action '{action_type}' requires manual approval."
         
         else:
@@ -257,4 +301,5 @@ class ActionExecutor:
         Args:
             plan: ExecutionPlan object
         """
-        self.logger.info(f"\n{plan.summary()}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("\n%s", plan.summary())
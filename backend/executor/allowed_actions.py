@@ -3,32 +3,38 @@ Allowed action types and validation schemas.
 Defines which actions can be executed and their required fields.
 """
 
-# List of allowed action types
+# Set of allowed action types (unordered; use sorted() for display)
 # Each action must be approved by decide_eligibility() before execution planning
-ALLOWED_ACTIONS = [
+ALLOWED_ACTIONS = frozenset({
     "flag",      # Flag email for follow-up
     "archive",   # Archive email
     "label",     # Apply label
     "read",      # Mark as read
     "spam",      # Report as spam
-]
+})
 
 # Action validation requirements
 ACTION_REQUIRED_FIELDS = {
-    "flag": ["type"],
-    "archive": ["type"],
-    "label": ["type", "label"],  # label field required
-    "read": ["type"],
-    "spam": ["type"],
+    "flag": ("type",),
+    "archive": ("type",),
+    "label": ("type", "label"),  # label field required
+    "read": ("type",),
+    "spam": ("type",),
+}
+
+# Required fields as sets, for checking an action's keys in one difference
+ACTION_REQUIRED_FIELDSETS = {
+    action_type: frozenset(fields)
+    for action_type, fields in ACTION_REQUIRED_FIELDS.items()
 }
 
 # Action optional fields
 ACTION_OPTIONAL_FIELDS = {
-    "flag": ["priority", "reason"],
-    "archive": ["priority"],
-    "label": ["priority"],
-    "read": ["priority"],
-    "spam": ["priority"],
+    "flag": ("priority", "reason"),
+    "archive": ("priority",),
+    "label": ("priority",),
+    "read": ("priority",),
+    "spam": ("priority",),
 }
 
 
@@ -42,10 +48,10 @@ def is_action_type_allowed(action_type: str) -> bool:
     Returns:
         True if action type is allowed, False otherwise
     """
-    return action_type in ALLOWED_ACTIONS
+    return isinstance(action_type, str) and action_type in ALLOWED_ACTIONS
 
 
-def get_required_fields(action_type: str) -> list:
+def get_required_fields(action_type: str) -> tuple:
     """
     Get required fields for an action type.
     
@@ -53,12 +59,12 @@ def get_required_fields(action_type: str) -> list:
         action_type: The action type
     
     Returns:
-        List of required field names
+        Tuple of required field names
     """
-    return ACTION_REQUIRED_FIELDS.get(action_type, ["type"])
+    return ACTION_REQUIRED_FIELDS.get(action_type, ("type",))
 
 
-def get_optional_fields(action_type: str) -> list:
+def get_optional_fields(action_type: str) -> tuple:
     """
     Get optional fields for an action type.
     
@@ -66,6 +72,6 @@ def get_optional_fields(action_type: str) -> list:
         action_type: The action type
     
     Returns:
-        List of optional field names
+        Tuple of optional field names
     """
-    return ACTION_OPTIONAL_FIELDS.get(action_type, [])
+    return ACTION_OPTIONAL_FIELDS.get(action_type, ())
@@ -2,13 +2,16 @@
 Execution plan structures and audit trail.
 Represents a planned sequence of actions without executing them.
 """
+from collections import defaultdict
 from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 from enum import Enum
 
+import orjson
 
-class ExecutionDecision(str, Enum):
+
+class ExecutionDecision(Enum):
     """Decision status for an action."""
     APPROVED = "approved"
     BLOCKED = "blocked"
@@ -16,7 +19,7 @@ class ExecutionDecision(str, Enum):
     SIMULATED = "simulated"
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionStep:
     """
     A single planned action step.
@@ -31,18 +34,23 @@ class ExecutionStep:
     decision: ExecutionDecision
     reasoning: str
     is_simulated: bool = False
+    # Serialized decision, resolved once since steps are not modified after planning
+    decision_value: str = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self.decision_value = self.decision.value
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
             "action": self.action,
-            "decision": self.decision.value,
+            "decision": self.decision_value,
             "reasoning": self.reasoning,
             "is_simulated": self.is_simulated,
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionPlan:
     """
     A plan to execute a set of actions.
@@ -68,6 +76,16 @@ class ExecutionPlan:
     is_simulated: bool = True
     status: str = "planned"
     reasoning: str = ""
+    # Actions bucketed by decision, kept in step order by add_step
+    _by_decision: Dict[ExecutionDecision, List[Dict[str, Any]]] = field(
+        init=False, repr=False, compare=False, default_factory=lambda: defaultdict(list)
+    )
+    # (created_at, ISO string) from the last serialization
+    _created_at_iso: Optional[tuple] = field(init=False, repr=False, compare=False, default=None)
+    
+    def __post_init__(self):
+        for step in self.steps:
+            self._by_decision[step.decision].append(step.action)
     
     def add_step(
         self,
@@ -90,6 +108,7 @@ class ExecutionPlan:
             is_simulated=self.is_simulated,
         )
         self.steps.append(step)
+        self._by_decision[decision].append(action)
     
     def get_approved_actions(self) -> List[Dict[str, Any]]:
         """
@@ -98,11 +117,7 @@ class ExecutionPlan:
         Returns:
             List of approved action specifications
         """
-        return [
-            step.action
-            for step in self.steps
-            if step.decision == ExecutionDecision.APPROVED
-        ]
+        return list(self._by_decision[ExecutionDecision.APPROVED])
     
     def get_blocked_actions(self) -> List[Dict[str, Any]]:
         """
@@ -111,11 +126,7 @@ class ExecutionPlan:
         Returns:
             List of blocked action specifications
         """
-        return [
-            step.action
-            for step in self.steps
-            if step.decision == ExecutionDecision.BLOCKED
-        ]
+        return list(self._by_decision[ExecutionDecision.BLOCKED])
     
     def summary(self) -> str:
         """
@@ -124,8 +135,8 @@ class ExecutionPlan:
         Returns:
             Summary string
         """
-        approved_count = len(self.get_approved_actions())
-        blocked_count = len(self.get_blocked_actions())
+        approved_count = len(self._by_decision[ExecutionDecision.APPROVED])
+        blocked_count = len(self._by_decision[ExecutionDecision.BLOCKED])
         
         summary = (
             f"ExecutionPlan for recommendation {self.recommendation_id}\n"
@@ -140,6 +151,13 @@ class ExecutionPlan:
         
         return summary
     
+    def created_at_iso(self) -> str:
+        """ISO timestamp of created_at, formatted once unless created_at changes."""
+        cached = self._created_at_iso
+        if cached is None or cached[0] is not self.created_at:
+            cached = self._created_at_iso = (self.created_at, self.created_at.isoformat())
+        return cached[1]
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
         return {
@@ -147,8 +165,12 @@ class ExecutionPlan:
             "user_id": self.user_id,
             "email_job_id": self.email_job_id,
             "steps": [step.to_dict() for step in self.steps],
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at_iso(),
             "is_simulated": self.is_simulated,
             "status": self.status,
             "reasoning": self.reasoning,
         }
+    
+    def to_json(self) -> bytes:
+        """Serialize to JSON bytes in one pass, e.g. for audit storage or responses."""
+        return orjson.dumps(self.to_dict(), option=orjson.OPT_NON_STR_KEYS)
@@ -1,19 +1,29 @@
 """
 Initialize LLM package.
+Exports are imported on first access, keeping the OpenAI/LangChain imports
+off the startup path. A name resolves to None if its module fails to import.
 """
-try:
-    from .classifier import EmailClassifier
-except Exception:
-    EmailClassifier = None
+from importlib import import_module
 
-try:
-    from .analyzer import DataAnalyzer, S3DataHandler
-except Exception:
-    DataAnalyzer = None
-    S3DataHandler = None
+_EXPORTS = {
+    "EmailClassifier": ".classifier",
+    "DataAnalyzer": ".analyzer",
+    "S3DataHandler": ".analyzer",
+}
 
 __all__ = [
     "EmailClassifier",
     "DataAnalyzer",
     "S3DataHandler",
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(import_module(_EXPORTS[name], __name__), name)
+    except Exception:
+        value = None
+    globals()[name] = value
+    return value
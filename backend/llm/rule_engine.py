@@ -3,14 +3,29 @@ Rule evaluation engine for generating action recommendations.
 Evaluates email classification and metadata against user-defined rules.
 Does NOT execute any actions - only generates recommendations.
 """
+import hashlib
 import logging
 import json
-from typing import Optional, Dict, List, Any
+import threading
+from typing import Optional, Dict, List, Any, Tuple
 from datetime import datetime
 import re
+from functools import lru_cache
+from operator import itemgetter
+
+from cachetools import LRUCache
 
 logger = logging.getLogger(__name__)
 
+# Evaluations remembered per engine for re-processed emails
+EVALUATION_CACHE_SIZE = 512
+
+# Engines kept for user rule sets, so tasks reuse their caches
+RULE_ENGINE_CACHE_SIZE = 64
+
+# Wildcard patterns whose text is plain ASCII can skip the regex engine
+_LITERAL_PATTERN_RE = re.compile(r"[A-Za-z0-9_.@-]+")
+
 
 class RuleEvaluationResult:
     """Result of evaluating rules against an email."""
@@ -31,6 +46,58 @@ class RuleEvaluationResult:
             "confidence_score": self.confidence_score,
             "reasoning": self.reasoning,
         }
+    
+    def copy(self) -> "RuleEvaluationResult":
+        """Copy the result, including its rule and action dicts."""
+        copied = RuleEvaluationResult()
+        copied.matched_rules = [dict(rule) for rule in self.matched_rules]
+        copied.recommended_actions = [dict(action) for action in self.recommended_actions]
+        copied.safety_flags = list(self.safety_flags)
+        copied.confidence_score = self.confidence_score
+        copied.reasoning = self.reasoning
+        return copied
+
+
+class _RuleConditions:
+    """Rule conditions normalized once for matching."""
+    
+    __slots__ = (
+        "sender_patterns",
+        "sender_contains",
+        "sender_prefixes",
+        "sender_regex_patterns",
+        "subject_keywords",
+        "body_keywords",
+        "labels",
+    )
+    
+    def __init__(self, conditions: Dict[str, Any]):
+        # Wildcard patterns only anchor at the start, so "*literal*" means
+        # "contains literal" and "literal*" means "starts with literal"
+        self.sender_patterns = tuple(conditions.get("sender_pattern", []))
+        contains, prefixes, regex_patterns = [], [], []
+        for pattern in self.sender_patterns:
+            if pattern.startswith("^") or pattern.startswith("("):
+                regex_patterns.append(pattern)
+                continue
+            literal = pattern.lstrip("*").rstrip("*")
+            if literal and not _LITERAL_PATTERN_RE.fullmatch(literal):
+                regex_patterns.append(pattern)
+            elif pattern.startswith("*") or not literal:
+                contains.append(literal.lower())
+            else:
+                prefixes.append(literal.lower())
+        self.sender_contains = tuple(contains)
+        self.sender_prefixes = tuple(prefixes)
+        self.sender_regex_patterns = tuple(regex_patterns)
+        
+        self.subject_keywords = tuple(
+            keyword.lower() for keyword in conditions.get("subject_keywords", [])
+        )
+        self.body_keywords = tuple(
+            keyword.lower() for keyword in conditions.get("body_keywords", [])
+        )
+        self.labels = frozenset(conditions.get("labels", []))
 
 
 class RuleEngine:
@@ -68,6 +135,19 @@ class RuleEngine:
         """
         self.rules = rules or self._get_default_rules()
         self._validate_rules()
+        # Sender pattern -> (is_regex, compiled pattern or None if invalid)
+        self._compiled_patterns: Dict[str, Tuple[bool, Optional[re.Pattern]]] = {}
+        for rule in self.rules:
+            for pattern in rule.get("conditions", {}).get("sender_pattern", []):
+                self._compile_pattern(pattern)
+        # id(rule) -> normalized conditions; rules stay referenced by self.rules
+        self._rule_conditions: Dict[int, _RuleConditions] = {
+            id(rule): _RuleConditions(rule.get("conditions", {}))
+            for rule in self.rules
+        }
+        self._build_rule_index()
+        self._evaluation_cache = LRUCache(maxsize=EVALUATION_CACHE_SIZE)
+        self._evaluation_cache_lock = threading.Lock()
         logger.info(f"RuleEngine initialized with {len(self.rules)} rules")
     
     def evaluate(
@@ -93,6 +173,96 @@ class RuleEngine:
         Returns:
             RuleEvaluationResult with recommendations and reasoning
         """
+        # Evaluation is a pure function of its inputs; re-processed emails
+        # get a copy of the earlier result
+        key = self._evaluation_key(classification, confidence, sender, subject, body, labels)
+        with self._evaluation_cache_lock:
+            cached = self._evaluation_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        
+        result = self._evaluate(classification, confidence, sender, subject, body, labels)
+        with self._evaluation_cache_lock:
+            self._evaluation_cache[key] = result.copy()
+        return result
+    
+    def evaluate_batch(self, emails: List[Dict[str, Any]]) -> List[RuleEvaluationResult]:
+        """
+        Evaluate all rules against several emails.
+        
+        The cache is consulted and filled once for the whole batch, and
+        emails with identical inputs (e.g. a newsletter blast) are
+        evaluated once and copied.
+        
+        Args:
+            emails: Dicts of evaluate() keyword arguments
+            
+        Returns:
+            One RuleEvaluationResult per email, in input order
+        """
+        if len(emails) == 1:
+            return [self.evaluate(**emails[0])]
+        
+        keys = [self._evaluation_key(**email) for email in emails]
+        with self._evaluation_cache_lock:
+            cached = [self._evaluation_cache.get(key) for key in keys]
+        
+        evaluated: Dict[tuple, RuleEvaluationResult] = {}
+        for email, key, result in zip(emails, keys, cached):
+            if result is None and key not in evaluated:
+                evaluated[key] = self._evaluate(
+                    email["classification"],
+                    email["confidence"],
+                    email["sender"],
+                    email["subject"],
+                    email["body"],
+                    email.get("labels"),
+                )
+        
+        if evaluated:
+            with self._evaluation_cache_lock:
+                for key, result in evaluated.items():
+                    self._evaluation_cache[key] = result
+        
+        return [
+            (result if result is not None else evaluated[key]).copy()
+            for key, result in zip(keys, cached)
+        ]
+    
+    @staticmethod
+    def _evaluation_key(
+        classification: str,
+        confidence: float,
+        sender: str,
+        subject: str,
+        body: str,
+        labels: Optional[List[str]] = None,
+    ) -> tuple:
+        """Build the evaluation cache key from every input that affects the result."""
+        return (
+            classification,
+            confidence,
+            sender,
+            subject,
+            hashlib.blake2b(body.encode(), digest_size=16).digest(),
+            tuple(labels) if labels else (),
+        )
+    
+    def clear_cache(self):
+        """Forget remembered evaluations."""
+        with self._evaluation_cache_lock:
+            self._evaluation_cache.clear()
+    
+    def _evaluate(
+        self,
+        classification: str,
+        confidence: float,
+        sender: str,
+        subject: str,
+        body: str,
+        labels: Optional[List[str]],
+    ) -> RuleEvaluationResult:
+        """Evaluate all rules against email metadata without the cache."""
         result = RuleEvaluationResult()
         
         # Build email context for rule evaluation
@@ -105,33 +275,28 @@ class RuleEngine:
             "labels": labels or [],
         }
         
-        # Evaluate each rule
-        for rule in self.rules:
-            if not rule.get("is_active", True):
-                continue
-            
+        # Evaluate only active rules that can match this category
+        rules = self._rules_by_category.get(classification, self._rules_any_category)
+        for rule in rules:
             if self._rule_matches(rule, email_context):
                 result.matched_rules.append({
                     "name": rule["name"],
                     "priority": rule.get("priority", 5),
                 })
                 
-                # Generate actions from rule
-                actions = rule.get("actions", [])
-                for action in actions:
-                    action_obj = self._create_action(action, email_context)
-                    if action_obj:
-                        result.recommended_actions.append(action_obj)
+                # Copy the rule's prebuilt actions
+                result.recommended_actions.extend(
+                    dict(action) for action in self._rule_actions[id(rule)]
+                )
                 
                 # Check for safety flags
                 flags = rule.get("safety_flags", [])
                 result.safety_flags.extend(flags)
         
-        # Sort actions by priority
-        result.recommended_actions.sort(
-            key=lambda x: x.get("priority", 5),
-            reverse=True
-        )
+        # Sort actions by priority; each rule's actions are already sorted,
+        # so this only merges runs, and one matched rule needs no sort
+        if len(result.matched_rules) > 1:
+            result.recommended_actions.sort(key=itemgetter("priority"), reverse=True)
         
         # Generate reasoning and confidence
         if result.matched_rules:
@@ -147,6 +312,50 @@ class RuleEngine:
         
         return result
     
+    def _build_rule_index(self):
+        """
+        Index active rules by the categories they accept and prebuild
+        their actions.
+        
+        Each category bucket also holds the rules without a category
+        condition, keeping the original rule order so matched rules and
+        tied action priorities come out as from a full scan. Categories
+        no rule names fall back to _rules_any_category.
+        """
+        self._rules_any_category: List[Dict[str, Any]] = []
+        # id(rule) -> its valid actions, built once and sorted by priority
+        self._rule_actions: Dict[int, List[Dict[str, Any]]] = {}
+        self._rules_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        active_rules = [rule for rule in self.rules if rule.get("is_active", True)]
+        
+        indexed = {}
+        for rule in active_rules:
+            # Actions don't depend on the email; invalid ones are logged once here
+            actions = [self._create_action(action, {}) for action in rule.get("actions", [])]
+            self._rule_actions[id(rule)] = sorted(
+                (action for action in actions if action),
+                key=itemgetter("priority"),
+                reverse=True,
+            )
+            
+            categories = rule.get("conditions", {}).get("category", [])
+            if isinstance(categories, (list, tuple, set, frozenset)):
+                indexed[id(rule)] = set(categories)
+                self._rules_by_category.update(
+                    (category, []) for category in categories
+                )
+        
+        for rule in active_rules:
+            categories = indexed.get(id(rule))
+            if not categories:
+                # No category filter, or a non-list one left to _rule_matches
+                self._rules_any_category.append(rule)
+                for bucket in self._rules_by_category.values():
+                    bucket.append(rule)
+            else:
+                for category in categories:
+                    self._rules_by_category[category].append(rule)
+    
     def _rule_matches(
         self,
         rule: Dict[str, Any],
@@ -161,6 +370,10 @@ class RuleEngine:
             
         Returns:
             True if all conditions match
+        
+        Cheap, exact conditions (category, confidence, labels) are checked
+        before the text scans, and the body, usually the longest text,
+        is scanned last.
         """
         conditions = rule.get("conditions", {})
         
@@ -174,48 +387,115 @@ class RuleEngine:
         if email_context["confidence"] < min_confidence:
             return False
         
+        # Rules outside this engine are normalized on the fly
+        prepared = self._rule_conditions.get(id(rule))
+        if prepared is None:
+            prepared = _RuleConditions(conditions)
+        
+        # Check labels (if present)
+        if prepared.labels:
+            labels = email_context.get("labels_set")
+            if labels is None:
+                labels = email_context["labels_set"] = frozenset(email_context["labels"])
+            if labels.isdisjoint(prepared.labels):
+                return False
+        
         # Check sender pattern
-        sender_patterns = conditions.get("sender_pattern", [])
-        if sender_patterns:
-            sender_match = any(
-                self._pattern_matches(pattern, email_context["sender"])
-                for pattern in sender_patterns
-            )
-            if not sender_match:
+        if prepared.sender_patterns:
+            if not self._sender_matches(prepared, email_context):
                 return False
         
         # Check subject keywords
-        subject_keywords = conditions.get("subject_keywords", [])
-        if subject_keywords:
-            subject_match = any(
-                keyword.lower() in email_context["subject"].lower()
-                for keyword in subject_keywords
-            )
-            if not subject_match:
+        if prepared.subject_keywords:
+            if not self._any_keyword_in(prepared.subject_keywords, email_context, "subject"):
                 return False
         
         # Check body keywords
-        body_keywords = conditions.get("body_keywords", [])
-        if body_keywords:
-            body_match = any(
-                keyword.lower() in email_context["body"].lower()
-                for keyword in body_keywords
-            )
-            if not body_match:
-                return False
-        
-        # Check labels (if present)
-        required_labels = conditions.get("labels", [])
-        if required_labels:
-            label_match = any(
-                label in email_context["labels"]
-                for label in required_labels
-            )
-            if not label_match:
+        if prepared.body_keywords:
+            if not self._any_keyword_in(prepared.body_keywords, email_context, "body"):
                 return False
         
         return True
     
+    def _any_keyword_in(
+        self,
+        keywords: Tuple[str, ...],
+        email_context: Dict[str, Any],
+        field: str,
+    ) -> bool:
+        """
+        Check if any lowercased keyword occurs in a text field, ignoring case.
+        
+        Hits are remembered in email_context per distinct keyword, so a
+        keyword shared by several rules scans the text once, and the field
+        is lowercased once per email instead of once per rule.
+        
+        Args:
+            keywords: Lowercased keywords from a rule condition
+            email_context: Email metadata
+            field: "subject" or "body"
+            
+        Returns:
+            True if at least one keyword is found
+        """
+        hits, text = self._keyword_memo(email_context, field)
+        for keyword in keywords:
+            found = hits.get(keyword)
+            if found is None:
+                found = hits[keyword] = keyword in text
+            if found:
+                return True
+        return False
+    
+    @staticmethod
+    def _keyword_memo(
+        email_context: Dict[str, Any],
+        field: str,
+    ) -> Tuple[Dict[str, bool], str]:
+        """Return (keyword hits, lowercased text) for a field, creating them once per email."""
+        memo = email_context.get("_keyword_hits")
+        if memo is None:
+            memo = email_context["_keyword_hits"] = {}
+        field_memo = memo.get(field)
+        if field_memo is None:
+            field_memo = memo[field] = ({}, email_context[field].lower())
+        return field_memo
+    
+    def _sender_matches(
+        self,
+        prepared: _RuleConditions,
+        email_context: Dict[str, Any],
+    ) -> bool:
+        """
+        Check a rule's sender patterns against the email sender.
+        
+        Plain wildcard patterns are tested as substring or prefix checks
+        on the lowercased sender, sharing hits across rules like keywords.
+        Only regex patterns, or any pattern when the sender is not ASCII
+        (where IGNORECASE and lower() can disagree), go through re.
+        
+        Args:
+            prepared: Normalized rule conditions
+            email_context: Email metadata
+            
+        Returns:
+            True if any pattern matches
+        """
+        sender = email_context["sender"]
+        if not sender.isascii():
+            patterns = prepared.sender_patterns
+        else:
+            if prepared.sender_contains:
+                if self._any_keyword_in(prepared.sender_contains, email_context, "sender"):
+                    return True
+            if prepared.sender_prefixes:
+                _, sender_lower = self._keyword_memo(email_context, "sender")
+                if sender_lower.startswith(prepared.sender_prefixes):
+                    return True
+            patterns = prepared.sender_regex_patterns
+        
+        return any(self._pattern_matches(pattern, sender) for pattern in patterns)
+    
     def _pattern_matches(self, pattern: str, text: str) -> bool:
         """
         Check if pattern matches text.
@@ -228,20 +508,44 @@ class RuleEngine:
         Returns:
             True if matches
         """
-        try:
-            # Try regex first (if pattern looks like regex)
-            if pattern.startswith("^") or pattern.startswith("("):
-                return bool(re.search(pattern, text))
-            
-            # Convert wildcard pattern to regex
-            regex_pattern = pattern.replace(".", r"\.")
-            regex_pattern = regex_pattern.replace("*", ".*")
-            regex_pattern = regex_pattern.replace("?", ".")
-            
-            return bool(re.match(regex_pattern, text, re.IGNORECASE))
-        except Exception as e:
-            logger.warning(f"Pattern match error: {e}")
+        is_regex, compiled = self._compile_pattern(pattern)
+        if compiled is None:
             return False
+        if is_regex:
+            return compiled.search(text) is not None
+        return compiled.match(text) is not None
+    
+    def _compile_pattern(self, pattern: str) -> Tuple[bool, Optional[re.Pattern]]:
+        """
+        Compile a sender pattern once and cache it.
+        
+        Args:
+            pattern: Pattern with * or ? wildcards, or a regex
+            
+        Returns:
+            (is_regex, compiled pattern), with None for an invalid pattern
+        """
+        compiled = self._compiled_patterns.get(pattern)
+        if compiled is not None:
+            return compiled
+        
+        # Treat pattern as regex if it looks like one
+        is_regex = pattern.startswith("^") or pattern.startswith("(")
+        try:
+            if is_regex:
+                compiled = (True, re.compile(pattern))
+            else:
+                # Convert wildcard pattern to regex
+                regex_pattern = pattern.replace(".", r"\.")
+                regex_pattern = regex_pattern.replace("*", ".*")
+                regex_pattern = regex_pattern.replace("?", ".")
+                compiled = (False, re.compile(regex_pattern, re.IGNORECASE))
+        except re.error as e:
+            logger.warning(f"Invalid sender pattern '{pattern}': {e}")
+            compiled = (is_regex, None)
+        
+        self._compiled_patterns[pattern] = compiled
+        return compiled
     
     def _create_action(
         self,
@@ -505,3 +809,48 @@ def create_rule_engine(user_rules: Optional[List[Dict[str, Any]]] = None) -> Rul
     else:
         logger.info("Creating RuleEngine with default rules")
         return RuleEngine()
+
+
+@lru_cache(maxsize=1)
+def get_default_rule_engine() -> RuleEngine:
+    """
+    Shared RuleEngine with the default rules.
+    
+    RuleEngine holds no per-evaluation state, so one instance per process is
+    safe to reuse. Call get_default_rule_engine.cache_clear() to rebuild it.
+    
+    Returns:
+        Process-wide default RuleEngine
+    """
+    return create_rule_engine()
+
+
+_rule_engine_cache = LRUCache(maxsize=RULE_ENGINE_CACHE_SIZE)
+_rule_engine_cache_lock = threading.Lock()
+
+
+def get_rule_engine(user_rules: Optional[List[Dict[str, Any]]] = None) -> RuleEngine:
+    """
+    Shared RuleEngine for a rule set.
+    
+    Without user rules this is get_default_rule_engine(). Engines for user
+    rule sets are kept per distinct rule set, so repeated tasks for the
+    same user reuse the compiled rules and the evaluation cache.
+    
+    Args:
+        user_rules: Optional user-defined rules
+        
+    Returns:
+        RuleEngine for the rule set
+    """
+    if not user_rules:
+        return get_default_rule_engine()
+    
+    key = json.dumps(user_rules, sort_keys=True, default=str)
+    with _rule_engine_cache_lock:
+        engine = _rule_engine_cache.get(key)
+    if engine is None:
+        engine = create_rule_engine(user_rules)
+        with _rule_engine_cache_lock:
+            _rule_engine_cache[key] = engine
+    return engine
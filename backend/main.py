@@ -3,11 +3,12 @@ FastAPI application entry point.
 """
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import logging
 from contextlib import asynccontextmanager
 
 from config import settings
-from database import init_db
+from database import init_db, warm_pool, dispose_pool
 
 # Configure logging
 logging.basicConfig(level=settings.log_level)
@@ -23,9 +24,15 @@ async def lifespan(app: FastAPI):
     logger.info(f"Starting VA Scheduler API in {settings.fastapi_env} mode")
     init_db()
     logger.info("Database initialized")
+    warm_pool()
+
+    # Connectors hold only static OAuth config, so one instance serves all requests
+    from api.auth import create_gmail_connector
+    app.state.gmail_connector = create_gmail_connector()
     yield
     # Shutdown
     logger.info("Shutting down VA Scheduler API")
+    dispose_pool()
 
 
 # Create FastAPI application
@@ -36,6 +43,7 @@ app = FastAPI(
     root_path=settings.api_root_path,
     lifespan=lifespan,
     debug=settings.debug,
+    default_response_class=ORJSONResponse,
 )
 
 # Configure CORS
@@ -4,12 +4,13 @@ SQLAlchemy ORM models for the application.
 from datetime import datetime
 from typing import Optional, List
 from sqlalchemy import (
-    Column, String, Integer, Boolean, DateTime, Text, ForeignKey,
-    JSON, Enum as SQLEnum, Index
+    Column, String, SmallInteger, Boolean, DateTime, Text, ForeignKey,
+    JSON, Enum as SQLEnum, Index, UniqueConstraint
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
+import json
 import uuid
 
 Base = declarative_base()
@@ -37,8 +38,6 @@ class User(Base):
     data_analysis_jobs = relationship("DataAnalysisJob", back_populates="user", cascade="all, delete-orphan")
     action_recommendations = relationship("ActionRecommendation", back_populates="user", cascade="all, delete-orphan")
 
-    __table_args__ = (Index("idx_user_email", "email"),)
-
 
 class EmailAccount(Base):
     """Email account connected via OAuth2."""
@@ -60,9 +59,9 @@ class EmailAccount(Base):
     user = relationship("User", back_populates="email_accounts")
     email_jobs = relationship("EmailJob", back_populates="email_account")
 
+    # user_id is indexed via index=True; the unique constraint also serves provider lookups
     __table_args__ = (
-        Index("idx_email_account_user", "user_id"),
-        Index("idx_email_account_provider", "provider"),
+        UniqueConstraint("provider", "email", name="uq_provider_email"),
     )
 
 
@@ -78,7 +77,7 @@ class EmailJob(Base):
     sender = Column(String, nullable=True)
     body = Column(Text, nullable=True)
     classification = Column(String, nullable=True)  # important, spam, followup, etc.
-    classification_confidence = Column(Integer, nullable=True)  # 0-100 confidence score (stored as int percentage)
+    classification_confidence = Column(SmallInteger, nullable=True)  # 0-100 confidence score (stored as int percentage)
     classification_explanation = Column(Text, nullable=True)  # Explanation of classification
     is_flagged = Column(Boolean, default=False)
     auto_reply_sent = Column(Boolean, default=False)
@@ -95,6 +94,16 @@ class EmailJob(Base):
         Index("idx_email_job_user", "user_id"),
         Index("idx_email_job_processed", "is_processed"),
         Index("idx_email_job_classification", "classification"),
+        # Classified list: filter by user, order by (classified_at, id) DESC. Partial
+        # on the IS NOT NULL predicate; INCLUDE covers the common filters.
+        Index(
+            "ix_email_job_user_classified_at",
+            "user_id",
+            classified_at.desc(),
+            id.desc(),
+            postgresql_where=classification.isnot(None),
+            postgresql_include=["classification", "classification_confidence"],
+        ),
     )
 
 
@@ -123,7 +132,7 @@ class ActionRecommendation(Base):
 
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
-    email_job_id = Column(String, ForeignKey("email_jobs.id"), nullable=False, index=True)
+    email_job_id = Column(String, ForeignKey("email_jobs.id"), nullable=False)  # unique, see uq_reco_email
     
     # Rule and trigger information
     rule_id = Column(String, nullable=True)  # Which rule(s) triggered this
@@ -134,11 +143,11 @@ class ActionRecommendation(Base):
     safety_flags = Column(JSON, nullable=True)  # Security/safety concerns
     
     # Evaluation info
-    confidence_score = Column(Integer, nullable=True)  # 0-100, how confident in recommendation
+    confidence_score = Column(SmallInteger, nullable=True)  # 0-100, how confident in recommendation
     reasoning = Column(Text, nullable=True)  # Plain English explanation
     
     # Status tracking
-    status = Column(String, default="generated")  # generated, reviewed, accepted, rejected
+    status = Column(String, default="generated")  # pending, generated, reviewed, accepted, rejected
     accepted_at = Column(DateTime, nullable=True)
     rejected_at = Column(DateTime, nullable=True)
     rejection_reason = Column(Text, nullable=True)
@@ -150,10 +159,44 @@ class ActionRecommendation(Base):
     user = relationship("User", back_populates="action_recommendations")
     email_job = relationship("EmailJob")
 
+    @property
+    def rule_name_list(self) -> List[str]:
+        """
+        rule_names as a list, parsed once per stored value.
+        
+        Accepts a JSON list or the comma-separated names the recommender writes.
+        """
+        raw = self.rule_names
+        cached = self.__dict__.get("_rule_name_list")
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+        
+        if raw is None:
+            names = []
+        else:
+            try:
+                names = json.loads(raw)
+            except (json.JSONDecodeError, TypeError):
+                names = None
+            if not isinstance(names, list):
+                names = [name.strip() for name in str(raw).split(",") if name.strip()]
+        self.__dict__["_rule_name_list"] = (raw, names)
+        return names
+
     __table_args__ = (
         Index("idx_action_recommendation_user", "user_id"),
-        Index("idx_action_recommendation_email", "email_job_id"),
+        # One recommendation per email; generate reserves the row with ON CONFLICT
+        UniqueConstraint("email_job_id", name="uq_reco_email"),
         Index("idx_action_recommendation_status", "status"),
+        # Recommendation list: filter by user (+ status), order by (created_at, id) DESC
+        Index(
+            "ix_reco_user_created_status",
+            "user_id",
+            "status",
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["confidence_score"],
+        ),
     )
 
 
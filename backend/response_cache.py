@@ -0,0 +1,133 @@
+"""
+Short-lived Redis cache for per-user GET responses.
+
+Keys embed a per-user version counter, so bumping the counter invalidates
+every cached response for that user at once. Redis errors fail open: the
+request is served from the database as if nothing were cached.
+"""
+import hashlib
+import logging
+from typing import Iterable, Optional
+
+import redis
+from fastapi import Request
+from fastapi.responses import Response
+
+from backend.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response is served before it is rebuilt
+RESPONSE_CACHE_TTL = 10
+
+_KEY_PREFIX = "respcache"
+_BODY_FIELD = "__body__"
+
+_client: Optional[redis.Redis] = None
+
+
+def get_redis() -> redis.Redis:
+    """Return the shared Redis client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = redis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+        )
+    return _client
+
+
+def _version_key(user_id: str) -> str:
+    return f"{_KEY_PREFIX}:{user_id}:version"
+
+
+def response_cache_key(user_id: str, request: Request) -> Optional[str]:
+    """
+    Build the cache key for a user's request.
+
+    Args:
+        user_id: Owner of the cached response
+        request: Incoming request; path and query string are part of the key
+
+    Returns:
+        Cache key, or None if Redis is unavailable
+    """
+    try:
+        version = get_redis().get(_version_key(user_id)) or b"0"
+    except redis.RedisError as e:
+        logger.warning(f"Response cache unavailable: {e}")
+        return None
+
+    target = f"{request.url.path}?{request.url.query}".encode()
+    digest = hashlib.sha1(target).hexdigest()
+    return f"{_KEY_PREFIX}:{user_id}:{version.decode()}:{digest}"
+
+
+def get_cached_response(key: Optional[str]) -> Optional[Response]:
+    """
+    Return the cached JSON response stored under key, if any.
+
+    Args:
+        key: Key from response_cache_key (None skips the lookup)
+
+    Returns:
+        Response rebuilt from the cached body and headers, or None on miss
+    """
+    if key is None:
+        return None
+    try:
+        entry = get_redis().hgetall(key)
+    except redis.RedisError as e:
+        logger.warning(f"Response cache read failed: {e}")
+        return None
+    if not entry:
+        return None
+
+    body = entry.pop(_BODY_FIELD.encode())
+    headers = {name.decode(): value.decode() for name, value in entry.items()}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def cache_response(
+    key: Optional[str],
+    response: Response,
+    headers: Iterable[str] = (),
+    ttl: int = RESPONSE_CACHE_TTL,
+) -> None:
+    """
+    Store a rendered JSON response under key.
+
+    Args:
+        key: Key from response_cache_key (None skips the write)
+        response: Rendered response whose body is cached
+        headers: Names of response headers to cache alongside the body
+        ttl: Seconds until the entry expires
+    """
+    if key is None:
+        return
+    mapping = {_BODY_FIELD: response.body}
+    for name in headers:
+        if name in response.headers:
+            mapping[name] = response.headers[name]
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hset(key, mapping=mapping)
+        pipe.expire(key, ttl)
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Response cache write failed: {e}")
+
+
+def invalidate_user_responses(user_id: str) -> None:
+    """
+    Invalidate every cached response for a user.
+
+    Old entries are left to expire; bumping the version makes them unreachable.
+    """
+    try:
+        get_redis().incr(_version_key(user_id))
+    except redis.RedisError as e:
+        logger.warning(f"Response cache invalidation failed for user {user_id}: {e}")
@@ -0,0 +1,63 @@
+"""
+Short-lived cache of verified JWT payloads.
+Lets repeat requests with the same token skip signature verification.
+"""
+import hashlib
+import threading
+import time
+from typing import Optional
+
+from cachetools import TTLCache
+
+from security.encryption import verify_token
+
+# Entries live at most TOKEN_CACHE_TTL seconds, and never past the token's own exp
+TOKEN_CACHE_MAXSIZE = 10000
+TOKEN_CACHE_TTL = 30
+
+_cache = TTLCache(maxsize=TOKEN_CACHE_MAXSIZE, ttl=TOKEN_CACHE_TTL)
+_lock = threading.Lock()
+
+
+def _cache_key(token: str) -> str:
+    """Key entries by token hash so raw tokens are never held in memory."""
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def get_token_payload(token: str) -> Optional[dict]:
+    """
+    Return the decoded payload for a JWT, verifying it only on cache miss.
+
+    Args:
+        token: Encoded JWT from the Authorization header
+
+    Returns:
+        Token payload, or None if the token is invalid or expired
+    """
+    key = _cache_key(token)
+    with _lock:
+        entry = _cache.get(key)
+
+    if entry is not None:
+        payload, exp = entry
+        if exp > time.time():
+            return payload
+        with _lock:
+            _cache.pop(key, None)
+        return None
+
+    payload = verify_token(token)
+    if payload is None:
+        return None
+
+    exp = payload.get("exp")
+    if exp is not None:
+        with _lock:
+            _cache[key] = (payload, exp)
+    return payload
+
+
+def clear_token_cache() -> None:
+    """Drop all cached payloads."""
+    with _lock:
+        _cache.clear()
@@ -119,7 +119,7 @@ class TestAllowedActions:
     def test_allowed_actions_defined(self):
         """Test allowed actions list is defined."""
         assert len(ALLOWED_ACTIONS) > 0
-        assert isinstance(ALLOWED_ACTIONS, list)
+        assert isinstance(ALLOWED_ACTIONS, frozenset)
     
     def test_flag_action_allowed(self):
         """Test flag action is in allowed list."""
@@ -244,6 +244,27 @@ class TestEligibilityDecisions:
         decision = executor.decide_eligibility(action)
         
         assert decision == ExecutionDecision.BLOCKED
+    
+    def test_batch_decisions_keep_input_order(self, executor):
+        """Test batch eligibility matches per-action decisions, in order."""
+        actions = [
+            {"type": "label"},
+            {"type": "flag", "priority": 9},
+            {"type": "delete_forever"},
+            {"type": "label", "label": "Important"},
+            {},
+        ]
+        
+        decisions = executor.decide_eligibility_batch(actions)
+        
+        assert decisions == [executor.decide_eligibility(a) for a in actions]
+        assert decisions == [
+            ExecutionDecision.BLOCKED,
+            ExecutionDecision.APPROVED,
+            ExecutionDecision.BLOCKED,
+            ExecutionDecision.APPROVED,
+            ExecutionDecision.BLOCKED,
+        ]
 
 
 # ============================================================================
@@ -431,7 +452,7 @@ class TestErrorHandling:
         # Should include only valid actions
         valid_steps = [
             s for s in plan.steps
-            if s.decision == ExecutionDecision.APPROVED
+            if s.decision is ExecutionDecision.APPROVED
         ]
         assert len(valid_steps) >= 2  # flag and archive
 
@@ -482,6 +503,19 @@ class TestAuditTrail:
         assert plan.reasoning is not None
         assert len(plan.reasoning) > 0
 
+    
+    def test_plan_reasoning_splits_comma_separated_rule_names(self, executor, test_recommendation):
+        """Test comma-separated rule_names, as the recommender writes them, become a list."""
+        test_recommendation.rule_names = "Flag important emails,Flag follow-up emails"
+        
+        assert test_recommendation.rule_name_list == [
+            "Flag important emails",
+            "Flag follow-up emails",
+        ]
+        
+        plan = executor.plan_execution(test_recommendation, [{"type": "flag"}])
+        
+        assert "['Flag important emails', 'Flag follow-up emails']" in plan.reasoning
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -4,14 +4,16 @@ Tests EmailClassifier and classification task integration.
 """
 import pytest
 import json
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from langchain_core.messages import AIMessage
 from datetime import datetime
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.models import Base, User, EmailAccount, EmailJob
-from backend.llm.classifier import EmailClassifier
+from backend.llm.classifier import BATCH_CLASSIFY_SIZE, CLASSIFY_MAX_TOKENS, EmailClassifier
 from backend.worker.tasks.classifier import classify_email, classify_emails_batch
 from backend.config import settings
 
@@ -121,11 +123,11 @@ class TestEmailClassifierClassification:
         """Test classification of important email."""
         # Mock LLM response
         mock_llm = MagicMock()
-        mock_llm.predict.return_value = json.dumps({
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
             "category": "important",
             "confidence": 0.95,
             "explanation": "Urgent business email from senior manager"
-        })
+        }))
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -143,11 +145,11 @@ class TestEmailClassifierClassification:
     def test_classify_spam_email(self, mock_chat_openai):
         """Test classification of spam email."""
         mock_llm = MagicMock()
-        mock_llm.predict.return_value = json.dumps({
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
             "category": "spam",
             "confidence": 0.98,
             "explanation": "Unsolicited promotional content"
-        })
+        }))
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -164,11 +166,11 @@ class TestEmailClassifierClassification:
     def test_classify_actionable_email(self, mock_chat_openai):
         """Test classification of actionable email."""
         mock_llm = MagicMock()
-        mock_llm.predict.return_value = json.dumps({
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
             "category": "actionable",
             "confidence": 0.87,
             "explanation": "Email contains specific task request"
-        })
+        }))
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -185,7 +187,7 @@ class TestEmailClassifierClassification:
     def test_classify_handles_invalid_response(self, mock_chat_openai):
         """Test classification handles invalid LLM response gracefully."""
         mock_llm = MagicMock()
-        mock_llm.predict.return_value = "This is not JSON"
+        mock_llm.invoke.return_value = AIMessage(content="This is not JSON")
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -203,11 +205,11 @@ class TestEmailClassifierClassification:
     def test_classify_handles_unknown_category(self, mock_chat_openai):
         """Test classification handles unknown category from LLM."""
         mock_llm = MagicMock()
-        mock_llm.predict.return_value = json.dumps({
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
             "category": "unknown_category_xyz",
             "confidence": 0.85,
             "explanation": "Some explanation"
-        })
+        }))
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -248,9 +250,47 @@ class TestEmailClassifierClassification:
         )
         
         # Check that body was truncated in the prompt
-        call_args = mock_llm.predict.call_args[0][0]
+        call_args = mock_llm.invoke.call_args[0][0][0].content
         assert "xxx" in call_args  # Should see truncated body
         assert len(call_args) < 4000  # Prompt should be reasonably sized
+    
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_classify_caches_repeated_email_at_zero_temperature(self, mock_chat_openai):
+        """Test identical emails reuse the first result when temperature is 0."""
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
+            "category": "promotional",
+            "confidence": 0.9,
+            "explanation": "Weekly newsletter"
+        }))
+        mock_chat_openai.return_value = mock_llm
+        
+        classifier = EmailClassifier(temperature=0.0)
+        email = {"sender": "news@shop.com", "subject": "This week's deals", "body": "Sale!"}
+        first = classifier.classify(**email)
+        second = classifier.classify(**email)
+        
+        assert first == second
+        assert mock_llm.invoke.call_count == 1
+    
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_classify_sender_rule_skips_llm(self, mock_chat_openai):
+        """Test senders matching a sender rule are classified without the LLM."""
+        mock_llm = MagicMock()
+        mock_chat_openai.return_value = mock_llm
+        
+        rules = json.dumps({"*@news.example.com": "promotional"})
+        with patch("backend.llm.classifier.settings.sender_category_rules", rules):
+            classifier = EmailClassifier()
+        result = classifier.classify(
+            sender="Deals <offers@mail.news.example.com>",
+            subject="50% off",
+            body="Today only",
+        )
+        
+        assert result["category"] == "promotional"
+        assert result["confidence"] == 1.0
+        mock_llm.invoke.assert_not_called()
 
 
 class TestEmailClassifierBatch:
@@ -261,13 +301,12 @@ class TestEmailClassifierBatch:
         """Test batch classification of multiple emails."""
         mock_llm = MagicMock()
         
-        responses = [
-            json.dumps({"category": "important", "confidence": 0.95, "explanation": "Boss email"}),
-            json.dumps({"category": "spam", "confidence": 0.98, "explanation": "Spam"}),
-            json.dumps({"category": "informational", "confidence": 0.75, "explanation": "FYI"}),
-        ]
-        
-        mock_llm.predict.side_effect = responses
+        # Entries are placed by their echoed index, not array position
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps([
+            {"index": 2, "category": "spam", "confidence": 0.98, "explanation": "Spam"},
+            {"index": 1, "category": "important", "confidence": 0.95, "explanation": "Boss email"},
+            {"index": 3, "category": "informational", "confidence": 0.75, "explanation": "FYI"},
+        ]))
         mock_chat_openai.return_value = mock_llm
         
         classifier = EmailClassifier()
@@ -279,10 +318,113 @@ class TestEmailClassifierBatch:
         
         results = classifier.batch_classify(emails)
         
+        # One prompt covers the whole batch
+        assert mock_llm.invoke.call_count == 1
         assert len(results) == 3
         assert results[0]["category"] == "important"
         assert results[1]["category"] == "spam"
         assert results[2]["category"] == "informational"
+    
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_batch_classify_falls_back_per_email(self, mock_chat_openai):
+        """Test a malformed batch response is retried one email at a time."""
+        mock_llm = MagicMock()
+        
+        mock_llm.invoke.side_effect = [
+            AIMessage(content=json.dumps({"category": "important", "confidence": 0.9})),  # not an array
+            AIMessage(content=json.dumps({"category": "important", "confidence": 0.95, "explanation": "Boss email"})),
+            AIMessage(content=json.dumps({"category": "spam", "confidence": 0.98, "explanation": "Spam"})),
+        ]
+        mock_chat_openai.return_value = mock_llm
+        
+        classifier = EmailClassifier()
+        emails = [
+            {"sender": "boss@company.com", "subject": "Urgent", "body": "Do this now"},
+            {"sender": "spam@bad.com", "subject": "Click here", "body": "Win money"},
+        ]
+        
+        results = classifier.batch_classify(emails)
+        
+        assert mock_llm.invoke.call_count == 3
+        assert [r["category"] for r in results] == ["important", "spam"]
+    
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_batch_classify_rejects_mismatched_indices(self, mock_chat_openai):
+        """Test a batch response with a duplicated index is retried per email."""
+        mock_llm = MagicMock()
+        
+        mock_llm.invoke.side_effect = [
+            AIMessage(content=json.dumps([
+                {"index": 1, "category": "spam", "confidence": 0.9},
+                {"index": 1, "category": "spam", "confidence": 0.9},
+            ])),
+            AIMessage(content=json.dumps({"category": "important", "confidence": 0.95, "explanation": "Boss email"})),
+            AIMessage(content=json.dumps({"category": "spam", "confidence": 0.98, "explanation": "Spam"})),
+        ]
+        mock_chat_openai.return_value = mock_llm
+        
+        classifier = EmailClassifier()
+        emails = [
+            {"sender": "boss@company.com", "subject": "Urgent", "body": "Do this now"},
+            {"sender": "spam@bad.com", "subject": "Click here", "body": "Win money"},
+        ]
+        
+        results = classifier.batch_classify(emails)
+        
+        assert mock_llm.invoke.call_count == 3
+        assert [r["category"] for r in results] == ["important", "spam"]
+    
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_batch_classify_parallel_chunks_keep_order(self, mock_chat_openai):
+        """Test chunks classified on worker threads land in input order."""
+        mock_llm = MagicMock()
+        
+        def respond(messages, max_tokens):
+            # Full chunks are "important", the short trailing chunk is "spam"
+            count = max_tokens // CLASSIFY_MAX_TOKENS
+            category = "important" if count == BATCH_CLASSIFY_SIZE else "spam"
+            return AIMessage(content=json.dumps([
+                {"index": index, "category": category, "confidence": 0.9, "explanation": ""}
+                for index in range(1, count + 1)
+            ]))
+        
+        mock_llm.invoke.side_effect = respond
+        mock_chat_openai.return_value = mock_llm
+        
+        classifier = EmailClassifier()
+        emails = [
+            {"sender": f"user{i}@company.com", "subject": f"Email {i}", "body": "Hello"}
+            for i in range(BATCH_CLASSIFY_SIZE + 2)
+        ]
+        
+        results = classifier.batch_classify(emails)
+        
+        assert mock_llm.invoke.call_count == 2
+        assert [r["category"] for r in results] == (
+            ["important"] * BATCH_CLASSIFY_SIZE + ["spam"] * 2
+        )
+    
+    @pytest.mark.asyncio
+    @patch("backend.llm.classifier.ChatOpenAI")
+    async def test_abatch_classify_multiple_emails(self, mock_chat_openai):
+        """Test async batch classification keeps results in input order."""
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content=json.dumps([
+            {"index": 1, "category": "important", "confidence": 0.95, "explanation": "Boss email"},
+            {"index": 2, "category": "spam", "confidence": 0.98, "explanation": "Spam"},
+        ])))
+        mock_chat_openai.return_value = mock_llm
+        
+        classifier = EmailClassifier()
+        emails = [
+            {"sender": "boss@company.com", "subject": "Urgent", "body": "Do this now"},
+            {"sender": "spam@bad.com", "subject": "Click here", "body": "Win money"},
+        ]
+        
+        results = await classifier.abatch_classify(emails)
+        
+        assert mock_llm.ainvoke.await_count == 1
+        assert [r["category"] for r in results] == ["important", "spam"]
 
 
 class TestParseClassificationResponse:
@@ -359,6 +501,54 @@ class TestClassifyEmailTask:
         assert hasattr(classify_email, 'apply_async')
         assert callable(classify_email)
 
+    @patch("backend.worker.tasks.classifier.invalidate_user_responses")
+    @patch("backend.llm.classifier.ChatOpenAI")
+    def test_classify_email_task_reuses_cached_result(
+        self, mock_chat_openai, mock_invalidate, tmp_path
+    ):
+        """Test repeated emails across tasks hit the shared classifier's cache."""
+        from backend.llm.classifier import get_email_classifier
+
+        database_url = f"sqlite:///{tmp_path / 'tasks.db'}"
+        engine = create_engine(database_url)
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        for email_id in ("newsletter-1", "newsletter-2"):
+            session.add(EmailJob(
+                id=email_id,
+                user_id="test-user",
+                email_account_id="test-account",
+                email_id=email_id,
+                sender="news@shop.com",
+                subject="This week's deals",
+                body="Sale!",
+                is_processed=True,
+            ))
+        session.commit()
+        session.close()
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content=json.dumps({
+            "category": "promotional",
+            "confidence": 0.9,
+            "explanation": "Weekly newsletter"
+        }))
+        mock_chat_openai.return_value = mock_llm
+
+        get_email_classifier.cache_clear()
+        try:
+            with patch("backend.worker.tasks.classifier.settings.database_url", database_url), \
+                    patch("backend.llm.classifier.settings.openai_temperature", 0.0), \
+                    patch("backend.llm.classifier.settings.openai_api_key", "test-key"):
+                first = classify_email.run("newsletter-1")
+                second = classify_email.run("newsletter-2")
+        finally:
+            get_email_classifier.cache_clear()
+
+        assert first["success"] and second["success"]
+        assert first["category"] == second["category"] == "promotional"
+        assert mock_llm.invoke.call_count == 1
+
 
 # ============================================================================
 # Test Category Validation
@@ -11,7 +11,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.models import Base, User, EmailAccount, EmailJob, ActionRecommendation
-from backend.llm.rule_engine import RuleEngine, create_rule_engine, RuleEvaluationResult
+from backend.llm.rule_engine import RuleEngine, create_rule_engine, get_default_rule_engine, get_rule_engine, RuleEvaluationResult
 from backend.worker.tasks.recommender import generate_recommendation
 from backend.config import settings
 
@@ -111,6 +111,30 @@ class TestRuleEngineInitialization:
         
         assert len(engine.rules) == 1
         assert engine.rules[0]["name"] == "Custom rule"
+    
+    def test_default_engine_is_shared(self):
+        """Test the default rule engine is built once and reused."""
+        get_default_rule_engine.cache_clear()
+        
+        engine = get_default_rule_engine()
+        
+        assert get_default_rule_engine() is engine
+        assert len(engine.rules) == len(create_rule_engine().rules)
+    
+    def test_rule_engine_shared_per_rule_set(self):
+        """Test engines are reused for equal rule sets and the default rules."""
+        get_default_rule_engine.cache_clear()
+        rules = [
+            {
+                "name": "Custom rule",
+                "conditions": {"category": ["important"]},
+                "actions": [{"type": "flag"}],
+            }
+        ]
+        
+        assert get_rule_engine() is get_default_rule_engine()
+        assert get_rule_engine(rules) is get_rule_engine(json.loads(json.dumps(rules)))
+        assert get_rule_engine(rules) is not get_default_rule_engine()
 
 
 class TestRuleMatching:
@@ -235,6 +259,86 @@ class TestRuleMatching:
         
         assert engine._rule_matches(rule, email_context) is True
 
+    
+    def test_match_labels(self):
+        """Test a label condition needs at least one of its labels."""
+        engine = create_rule_engine()
+        
+        rule = {
+            "name": "Starred inbox mail",
+            "conditions": {"labels": ["STARRED", "IMPORTANT"]},
+            "actions": [],
+        }
+        
+        def context(labels):
+            return {
+                "classification": "important",
+                "confidence": 0.8,
+                "sender": "ceo@company.com",
+                "subject": "Hello",
+                "body": "Hi",
+                "labels": labels,
+            }
+        
+        assert engine._rule_matches(rule, context(["INBOX", "STARRED"])) is True
+        assert engine._rule_matches(rule, context(["INBOX"])) is False
+        assert engine._rule_matches(rule, context([])) is False
+    
+    def test_keyword_hits_shared_across_rules(self):
+        """Test a keyword used by several rules is looked up once per email."""
+        engine = create_rule_engine()
+        
+        email_context = {
+            "classification": "important",
+            "confidence": 0.8,
+            "sender": "ceo@company.com",
+            "subject": "URGENT: Board Meeting Tomorrow",
+            "body": "Need your attendance",
+            "labels": [],
+        }
+        
+        urgent_rule = {
+            "name": "Flag urgent emails",
+            "conditions": {"subject_keywords": ["Urgent"]},
+            "actions": [],
+        }
+        asap_rule = {
+            "name": "Flag asap emails",
+            "conditions": {"subject_keywords": ["asap", "urgent"]},
+            "actions": [],
+        }
+        
+        assert engine._rule_matches(urgent_rule, email_context) is True
+        assert engine._rule_matches(asap_rule, email_context) is True
+        hits, _ = email_context["_keyword_hits"]["subject"]
+        assert hits == {"urgent": True, "asap": False}
+    
+    def test_match_sender_literal_patterns(self):
+        """Test plain wildcard patterns match like their regex form."""
+        engine = create_rule_engine()
+        
+        rule = {
+            "name": "Company senders",
+            "conditions": {"sender_pattern": ["*@company.com", "ceo@*"]},
+            "actions": [],
+        }
+        
+        def context(sender):
+            return {
+                "classification": "important",
+                "confidence": 0.8,
+                "sender": sender,
+                "subject": "Hello",
+                "body": "Hi",
+                "labels": [],
+            }
+        
+        # Patterns are anchored only at the start, so display names match
+        assert engine._rule_matches(rule, context("Boss <boss@COMPANY.com>")) is True
+        assert engine._rule_matches(rule, context("CEO@startup.io")) is True
+        assert engine._rule_matches(rule, context("boss@other.com")) is False
+        # Non-ASCII senders go through the regex path
+        assert engine._rule_matches(rule, context("j\u00fcrgen@company.com")) is True
 
 class TestActionGeneration:
     """Test action recommendation generation."""
@@ -371,6 +475,94 @@ class TestRuleEvaluation:
         assert isinstance(result.confidence_score, int)
         assert result.confidence_score >= 0
 
+    
+    def test_actions_sorted_across_rules(self):
+        """Test actions from several rules are ordered by priority, ties in rule order."""
+        engine = RuleEngine(rules=[
+            {
+                "name": "First",
+                "conditions": {},
+                "actions": [
+                    {"type": "read", "priority": 3},
+                    {"type": "label", "label": "A", "priority": 7},
+                ],
+            },
+            {
+                "name": "Second",
+                "conditions": {},
+                "actions": [
+                    {"type": "flag", "priority": 7},
+                    {"type": "archive", "priority": 9},
+                ],
+            },
+        ])
+        
+        result = engine.evaluate(
+            classification="informational",
+            confidence=0.9,
+            sender="a@b.com",
+            subject="Hi",
+            body="Hello",
+        )
+        
+        assert [a["type"] for a in result.recommended_actions] == ["archive", "label", "flag", "read"]
+        # Results don't share the engine's prebuilt actions
+        result.recommended_actions[0]["priority"] = 0
+        assert engine._rule_actions[id(engine.rules[1])][0]["priority"] == 9
+    
+    def test_repeated_evaluation_uses_cache(self):
+        """Test re-evaluating the same email returns an independent copy."""
+        engine = create_rule_engine()
+        email = {
+            "classification": "important",
+            "confidence": 0.95,
+            "sender": "boss@company.com",
+            "subject": "Urgent: Q4 Report",
+            "body": "Please submit by EOD",
+        }
+        
+        first = engine.evaluate(**email)
+        first.recommended_actions[0]["priority"] = 0
+        
+        with patch.object(engine, "_evaluate") as mock_evaluate:
+            second = engine.evaluate(**email)
+            mock_evaluate.assert_not_called()
+        
+        assert second.recommended_actions[0]["priority"] == 9
+        assert second.matched_rules == first.matched_rules
+        
+        engine.clear_cache()
+        with patch.object(engine, "_evaluate", wraps=engine._evaluate) as mock_evaluate:
+            engine.evaluate(**email)
+            mock_evaluate.assert_called_once()
+    
+    def test_evaluate_batch_matches_evaluate(self):
+        """Test batch evaluation keeps input order and evaluates duplicates once."""
+        engine = create_rule_engine()
+        important = {
+            "classification": "important",
+            "confidence": 0.95,
+            "sender": "boss@company.com",
+            "subject": "Urgent: Q4 Report",
+            "body": "Please submit by EOD",
+        }
+        spam = {
+            "classification": "spam",
+            "confidence": 0.9,
+            "sender": "unknown@spam.com",
+            "subject": "Click here!!!",
+            "body": "Win money now",
+        }
+        
+        with patch.object(engine, "_evaluate", wraps=engine._evaluate) as mock_evaluate:
+            results = engine.evaluate_batch([important, spam, important])
+            assert mock_evaluate.call_count == 2
+        
+        expected = create_rule_engine()
+        assert [r.to_dict() for r in results] == [
+            expected.evaluate(**email).to_dict() for email in (important, spam, important)
+        ]
+        assert results[0].recommended_actions is not results[2].recommended_actions
 
 class TestConfidenceCalculation:
     """Test recommendation confidence scoring."""
@@ -480,6 +672,32 @@ class TestRecommendationTask:
         assert True  # Task structure validates this
 
 
+class TestRuleIndex:
+    """Test the category index used to pick candidate rules."""
+    
+    def test_category_buckets_keep_rule_order(self):
+        """Test buckets hold category and catch-all rules in rule order."""
+        engine = RuleEngine(rules=[
+            {"name": "Any", "conditions": {}, "actions": [{"type": "read"}]},
+            {"name": "Spam", "conditions": {"category": ["spam"]}, "actions": [{"type": "spam"}]},
+            {"name": "Off", "conditions": {"category": ["spam"]}, "actions": [{"type": "archive"}], "is_active": False},
+            {"name": "Both", "conditions": {"category": ["spam", "important"]}, "actions": [{"type": "flag"}]},
+        ])
+        
+        assert [r["name"] for r in engine._rules_by_category["spam"]] == ["Any", "Spam", "Both"]
+        assert [r["name"] for r in engine._rules_by_category["important"]] == ["Any", "Both"]
+        assert [r["name"] for r in engine._rules_any_category] == ["Any"]
+        
+        result = engine.evaluate(
+            classification="newsletter",
+            confidence=0.9,
+            sender="a@b.com",
+            subject="Hi",
+            body="Hello",
+        )
+        assert [r["name"] for r in result.matched_rules] == ["Any"]
+
+
 # ============================================================================
 # Pattern Matching Tests
 # ============================================================================
@@ -517,6 +735,22 @@ class TestPatternMatching:
         
         assert engine._pattern_matches("IMPORTANT", "important")
         assert engine._pattern_matches("Boss@*", "boss@company.com")
+    
+    def test_rule_patterns_compiled_at_init(self):
+        """Test sender patterns are compiled once when the engine is built."""
+        engine = RuleEngine(rules=[
+            {
+                "name": "Newsletter senders",
+                "conditions": {"sender_pattern": ["*@news.example.com", "(unclosed"]},
+                "actions": [{"type": "archive"}],
+            }
+        ])
+        
+        assert "*@news.example.com" in engine._compiled_patterns
+        assert engine._pattern_matches("*@news.example.com", "digest@news.example.com")
+        # Invalid regex is reported once and never matches
+        assert engine._compiled_patterns["(unclosed"][1] is None
+        assert not engine._pattern_matches("(unclosed", "(unclosed")
 
 
 # ============================================================================
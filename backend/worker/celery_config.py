@@ -7,6 +7,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# celery-batches tasks get their own queue and worker (see docker-compose)
+MANUAL_CLASSIFY_QUEUE = "manual_classify"
+
 # Initialize Celery app
 celery_app = Celery(
     "va_scheduler",
@@ -24,6 +27,14 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes hard limit
     task_soft_time_limit=25 * 60,  # 25 minutes soft limit
+    # celery-batches tasks buffer unacked messages, so a finite prefetch
+    # limit would stall the batch below flush_every. Unlimited prefetch is
+    # only safe for them: they run on a dedicated worker started with
+    # --prefetch-multiplier=0, while the default worker keeps the default
+    # multiplier so it can't hoard long-running tasks.
+    task_routes={
+        "classify_manual_batch": {"queue": MANUAL_CLASSIFY_QUEUE},
+    },
 )
 
 
@@ -3,16 +3,19 @@ Celery task for email classification.
 Classifies stored emails using LLM and stores results in database.
 """
 import logging
+from collections import defaultdict
 from datetime import datetime
 from typing import Optional
 
 from celery import shared_task
+from celery_batches import Batches
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.config import settings
+from backend.worker.tasks.dispatch import dispatch_chunked
 from backend.models import EmailJob
-from backend.llm.classifier import EmailClassifier
+from backend.response_cache import invalidate_user_responses
 
 logger = logging.getLogger(__name__)
 
@@ -52,9 +55,12 @@ def classify_email(
         
         try:
             # Fetch email job
-            email_job = session.query(EmailJob).filter(
-                EmailJob.id == email_job_id
-            ).first()
+            query = session.query(EmailJob).filter(EmailJob.id == email_job_id)
+            # Batch endpoints dispatch without checking ownership; only
+            # touch emails belonging to the requesting user
+            if user_context and user_context.get("user_id"):
+                query = query.filter(EmailJob.user_id == user_context["user_id"])
+            email_job = query.first()
             
             if not email_job:
                 logger.error(f"EmailJob not found: {email_job_id}")
@@ -76,8 +82,13 @@ def classify_email(
                     "already_classified": True,
                 }
             
-            # Initialize classifier
-            classifier = EmailClassifier()
+            # Imported here so loading this module (e.g. from the email
+            # router) doesn't pull in the LangChain/OpenAI stack
+            from backend.llm.classifier import get_email_classifier
+            
+            # Shared per process so the client and result cache survive
+            # across tasks
+            classifier = get_email_classifier()
             
             # Classify email
             result = classifier.classify(
@@ -105,6 +116,7 @@ def classify_email(
             email_job.classified_at = datetime.utcnow()
             
             session.commit()
+            invalidate_user_responses(email_job.user_id)
             logger.info(
                 f"Classified email {email_job_id}: {category} "
                 f"(confidence: {confidence:.2f})"
@@ -156,47 +168,59 @@ def classify_emails_batch(
         user_context: Optional user context
         
     Returns:
-        Dictionary with batch results:
-        - total: Total emails processed
-        - successful: Successful classifications
-        - failed: Failed classifications
-        - details: List of individual results
+        Dictionary with dispatch details:
+        - total: Total emails dispatched
+        - group_id: ID of the GroupResult tracking the chunks
+        - status: "dispatched"
     """
-    logger.info(f"Starting batch classification of {len(email_job_ids)} emails")
+    logger.info(f"Dispatching batch classification for {len(email_job_ids)} emails")
+    
+    # Fan out as chunked groups rather than enqueueing and waiting on each
+    # email serially; blocking on subtasks inside a task can deadlock workers.
+    result = dispatch_chunked(classify_email, email_job_ids, user_context)
     
-    results = {
+    return {
         "total": len(email_job_ids),
-        "successful": 0,
-        "failed": 0,
-        "details": [],
+        "group_id": result.id,
+        "status": "dispatched",
     }
+
+
+@shared_task(
+    base=Batches,
+    flush_every=16,
+    flush_interval=0.25,
+    name="classify_manual_batch",
+)
+def classify_manual_batch(requests: list) -> None:
+    """
+    Classify buffered manual classification requests together.
     
-    for email_job_id in email_job_ids:
-        try:
-            result = classify_email.apply_async(
-                args=(email_job_id,),
-                kwargs={"user_context": user_context},
-            ).get(timeout=30)  # Wait up to 30 seconds per email
-            
-            results["details"].append(result)
-            
-            if result.get("success"):
-                results["successful"] += 1
-            else:
-                results["failed"] += 1
-                
-        except Exception as e:
-            logger.error(f"Failed to classify email {email_job_id}: {e}")
-            results["failed"] += 1
-            results["details"].append({
-                "email_job_id": email_job_id,
-                "success": False,
-                "error": str(e),
-            })
+    celery-batches hands over up to flush_every requests at a time (or
+    whatever arrived within flush_interval seconds), so the classifier
+    setup and HTTP connection are shared across the whole batch. Requests
+    from different users may arrive together; they are split by user so
+    one user's email never shares an LLM prompt with another's.
+    
+    Args:
+        requests: SimpleRequest objects; kwargs hold user_id, sender, subject, body
+    """
+    from backend.llm.classifier import get_email_classifier
+    
+    classifier = get_email_classifier()
+    
+    if not classifier.llm:
+        error = ValueError("OpenAI API key not configured")
+        for request in requests:
+            classify_manual_batch.backend.mark_as_failure(request.id, error, request=request)
+        return
     
-    logger.info(
-        f"Batch classification complete: "
-        f"{results['successful']}/{results['total']} successful"
-    )
+    # Requests without a user_id are classified on their own
+    by_user = defaultdict(list)
+    for request in requests:
+        by_user[request.kwargs.get("user_id") or request.id].append(request)
     
-    return results
+    for user_requests in by_user.values():
+        results = classifier.batch_classify([request.kwargs for request in user_requests])
+        for request, result in zip(user_requests, results):
+            classify_manual_batch.backend.mark_as_done(request.id, result, request=request)
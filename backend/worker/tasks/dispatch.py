@@ -0,0 +1,43 @@
+"""
+Bulk dispatch helpers for per-email Celery tasks.
+Fans a list of email IDs out as chunked groups over a single producer.
+"""
+from typing import Optional
+
+from celery.result import GroupResult
+
+# Emails per chunk message; keeps broker message count at len(ids) / 100
+BATCH_CHUNK_SIZE = 100
+
+
+def dispatch_chunked(
+    task,
+    email_job_ids: list,
+    user_context: Optional[dict] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> GroupResult:
+    """
+    Enqueue task for every email ID as a group of chunks.
+    
+    All chunk messages are published through one pooled producer, so the
+    broker connection is acquired once instead of once per message.
+    
+    Args:
+        task: Celery task taking (email_job_id, user_context)
+        email_job_ids: IDs to process
+        user_context: User context passed to every call
+        chunk_size: Number of IDs handled per chunk message
+        
+    Returns:
+        Saved GroupResult; restore it later with GroupResult.restore(id)
+    """
+    job = task.chunks(
+        [(email_job_id, user_context) for email_job_id in email_job_ids],
+        chunk_size,
+    ).group()
+    
+    with task.app.producer_or_acquire() as producer:
+        result = job.apply_async(producer=producer)
+    
+    result.save()
+    return result
@@ -81,7 +81,7 @@ def fetch_and_process_emails(user_id: str, email_account_id: str, max_results: i
                     redirect_uri=settings.gmail_redirect_uri,
                 )
                 
-                token_data = gmail.refresh_access_token(refresh_token)
+                token_data = gmail.ensure_access_token(refresh_token)
                 access_token = token_data["access_token"]
                 
                 # Update database with new token
@@ -107,6 +107,7 @@ def fetch_and_process_emails(user_id: str, email_account_id: str, max_results: i
             access_token=access_token,
             max_results=max_results,
             query="is:unread",
+            include_body=True,  # Bodies are stored for classification
         )
         
         emails_fetched = len(emails)
@@ -7,16 +7,28 @@ from datetime import datetime
 from typing import Optional
 
 from celery import shared_task
+from celery.exceptions import Retry
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from backend.config import settings
+from backend.worker.tasks.dispatch import dispatch_chunked
 from backend.models import EmailJob, ActionRecommendation
-from backend.llm.rule_engine import create_rule_engine
+from backend.llm.rule_engine import get_rule_engine
+from backend.response_cache import invalidate_user_responses
 
 logger = logging.getLogger(__name__)
 
 
+def _release_pending(session, email_job_id: str) -> None:
+    """Delete the slot reserved by the generate endpoint so it can be requested again."""
+    session.query(ActionRecommendation).filter(
+        ActionRecommendation.email_job_id == email_job_id,
+        ActionRecommendation.status == "pending",
+    ).delete(synchronize_session=False)
+    session.commit()
+
+
 @shared_task(
     bind=True,
     max_retries=3,
@@ -56,12 +68,16 @@ def generate_recommendation(
         
         try:
             # Fetch email job
-            email_job = session.query(EmailJob).filter(
-                EmailJob.id == email_job_id
-            ).first()
+            query = session.query(EmailJob).filter(EmailJob.id == email_job_id)
+            # Batch endpoints dispatch without checking ownership; only
+            # touch emails belonging to the requesting user
+            if user_context and user_context.get("user_id"):
+                query = query.filter(EmailJob.user_id == user_context["user_id"])
+            email_job = query.first()
             
             if not email_job:
                 logger.error(f"EmailJob not found: {email_job_id}")
+                _release_pending(session, email_job_id)
                 return {
                     "email_job_id": email_job_id,
                     "success": False,
@@ -71,18 +87,21 @@ def generate_recommendation(
             # Check if email is classified
             if not email_job.classification:
                 logger.warning(f"Email {email_job_id} not classified, skipping recommendation")
+                # Free a slot reserved by the generate endpoint so it can be retried
+                _release_pending(session, email_job_id)
                 return {
                     "email_job_id": email_job_id,
                     "success": False,
                     "error": "Email not classified",
                 }
             
-            # Check if recommendation already exists
+            # Check if recommendation already exists; a pending row is the
+            # slot reserved by the generate endpoint and gets filled in below
             existing = session.query(ActionRecommendation).filter(
                 ActionRecommendation.email_job_id == email_job_id
             ).first()
             
-            if existing:
+            if existing and existing.status != "pending":
                 logger.info(f"Recommendation already exists for email {email_job_id}")
                 return {
                     "email_job_id": email_job_id,
@@ -96,8 +115,8 @@ def generate_recommendation(
             if user_context and "rules" in user_context:
                 user_rules = user_context["rules"]
             
-            # Create rule engine
-            engine_instance = create_rule_engine(user_rules)
+            # Shared engine for this rule set, so its caches carry across tasks
+            engine_instance = get_rule_engine(user_rules)
             
             # Evaluate rules
             evaluation = engine_instance.evaluate(
@@ -109,20 +128,21 @@ def generate_recommendation(
                 labels=None,  # TODO: Get from Gmail if available
             )
             
-            # Create recommendation record
-            recommendation = ActionRecommendation(
+            # Create recommendation record, or fill in the reserved one
+            recommendation = existing or ActionRecommendation(
                 user_id=email_job.user_id,
                 email_job_id=email_job_id,
-                rule_names=",".join(r["name"] for r in evaluation.matched_rules) if evaluation.matched_rules else None,
-                recommended_actions=evaluation.recommended_actions,
-                safety_flags=evaluation.safety_flags if evaluation.safety_flags else None,
-                confidence_score=evaluation.confidence_score,
-                reasoning=evaluation.reasoning,
-                status="generated",
             )
+            recommendation.rule_names = ",".join(r["name"] for r in evaluation.matched_rules) if evaluation.matched_rules else None
+            recommendation.recommended_actions = evaluation.recommended_actions
+            recommendation.safety_flags = evaluation.safety_flags if evaluation.safety_flags else None
+            recommendation.confidence_score = evaluation.confidence_score
+            recommendation.reasoning = evaluation.reasoning
+            recommendation.status = "generated"
             
             session.add(recommendation)
             session.commit()
+            invalidate_user_responses(email_job.user_id)
             
             logger.info(
                 f"Generated recommendation for email {email_job_id}: "
@@ -143,12 +163,20 @@ def generate_recommendation(
             logger.error(f"Error generating recommendation for {email_job_id}: {e}", exc_info=True)
             session.rollback()
             
+            # Out of retries: free the reserved slot before failing for good
+            if self.request.retries >= self.max_retries:
+                _release_pending(session, email_job_id)
+            
             # Retry with exponential backoff
             raise self.retry(exc=e)
             
         finally:
             session.close()
     
+    except Retry:
+        # Let Celery reschedule the task
+        raise
+    
     except Exception as e:
         logger.error(f"Task error for email {email_job_id}: {e}", exc_info=True)
         return {
@@ -177,47 +205,19 @@ def generate_recommendations_batch(
         user_context: Optional user context with rules
         
     Returns:
-        Dictionary with batch results:
-        - total: Total emails processed
-        - successful: Successful recommendations
-        - failed: Failed recommendations
-        - details: List of individual results
+        Dictionary with dispatch details:
+        - total: Total emails dispatched
+        - group_id: ID of the GroupResult tracking the chunks
+        - status: "dispatched"
     """
-    logger.info(f"Starting batch recommendation generation for {len(email_job_ids)} emails")
+    logger.info(f"Dispatching batch recommendation generation for {len(email_job_ids)} emails")
+    
+    # Fan out as chunked groups rather than enqueueing and waiting on each
+    # email serially; blocking on subtasks inside a task can deadlock workers.
+    result = dispatch_chunked(generate_recommendation, email_job_ids, user_context)
     
-    results = {
+    return {
         "total": len(email_job_ids),
-        "successful": 0,
-        "failed": 0,
-        "details": [],
+        "group_id": result.id,
+        "status": "dispatched",
     }
-    
-    for email_job_id in email_job_ids:
-        try:
-            result = generate_recommendation.apply_async(
-                args=(email_job_id,),
-                kwargs={"user_context": user_context},
-            ).get(timeout=30)
-            
-            results["details"].append(result)
-            
-            if result.get("success"):
-                results["successful"] += 1
-            else:
-                results["failed"] += 1
-                
-        except Exception as e:
-            logger.error(f"Failed to generate recommendation for {email_job_id}: {e}")
-            results["failed"] += 1
-            results["details"].append({
-                "email_job_id": email_job_id,
-                "success": False,
-                "error": str(e),
-            })
-    
-    logger.info(
-        f"Batch recommendation generation complete: "
-        f"{results['successful']}/{results['total']} successful"
-    )
-    
-    return results
@@ -210,13 +210,23 @@ def test_link_gmail_account(
         headers={"Authorization": f"Bearer {access_token}"},
     )
     
-    assert response.status_code == 200
+    assert response.status_code == 202
     data = response.json()
-    assert data["status"] == "success"
-    assert "email_account_id" in data
+    assert data["status"] == "accepted"
     assert data["provider"] == "gmail"
     assert data["email"] == test_gmail_email
 
+    # TestClient runs background tasks before returning the response
+    db = SessionLocal()
+    try:
+        email_account = db.query(EmailAccount).filter(
+            EmailAccount.provider == "gmail",
+            EmailAccount.email == test_gmail_email,
+        ).first()
+        assert email_account is not None
+    finally:
+        db.close()
+
 
 # ============================================================================
 # Test: Email Fetching and Storage
@@ -381,8 +391,15 @@ def test_end_to_end_email_ingestion(
         },
         headers={"Authorization": f"Bearer {access_token}"},
     )
-    assert link_response.status_code == 200
-    email_account_id = link_response.json()["email_account_id"]
+    assert link_response.status_code == 202
+    db = SessionLocal()
+    try:
+        email_account_id = db.query(EmailAccount.id).filter(
+            EmailAccount.provider == "gmail",
+            EmailAccount.email == test_gmail_email,
+        ).scalar()
+    finally:
+        db.close()
     
     # Step 4: Mock Gmail API and fetch emails
     mock_fetch_emails.return_value = [
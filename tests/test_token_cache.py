@@ -0,0 +1,54 @@
+"""
+Tests for the verified JWT payload cache.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+import pytest
+
+from security.encryption import create_access_token, verify_token
+from security.token_cache import get_token_payload, clear_token_cache
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty cache."""
+    clear_token_cache()
+    yield
+    clear_token_cache()
+
+
+def test_valid_token_returns_payload():
+    """Test a valid token is decoded."""
+    token = create_access_token({"sub": "user-1", "email": "user@example.com"})
+
+    payload = get_token_payload(token)
+
+    assert payload["sub"] == "user-1"
+    assert payload["email"] == "user@example.com"
+
+
+def test_repeat_token_skips_verification():
+    """Test a cached token is not verified again."""
+    token = create_access_token({"sub": "user-1"})
+
+    with patch("security.token_cache.verify_token", wraps=verify_token) as mock_verify:
+        get_token_payload(token)
+        get_token_payload(token)
+
+    assert mock_verify.call_count == 1
+
+
+def test_invalid_token_not_cached():
+    """Test invalid tokens return None every time."""
+    assert get_token_payload("not-a-jwt") is None
+    assert get_token_payload("not-a-jwt") is None
+
+
+def test_expired_cached_token_rejected():
+    """Test a cached entry is rejected once the token expires."""
+    token = create_access_token({"sub": "user-1"}, expires_delta=timedelta(minutes=5))
+    payload = get_token_payload(token)
+
+    with patch("security.token_cache.time.time", return_value=payload["exp"] + 1):
+        assert get_token_payload(token) is None
@@ -27,7 +27,7 @@ def main():
     
     # Test 1: Allowed actions list
     print("[1/5] Allowed action types...")
-    print(f"    ✓ Allowed actions: {ALLOWED_ACTIONS}")
+    print(f"    ✓ Allowed actions: {sorted(ALLOWED_ACTIONS)}")
     assert len(ALLOWED_ACTIONS) > 0
     print()
     